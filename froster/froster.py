@@ -12,12 +12,6 @@ from textual.screen import ModalScreen
 from textual.containers import Horizontal, Vertical
 from textual.app import App, ComposeResult
 from textual import on, work
-import psutil
-import botocore
-import boto3
-import duckdb
-import requests
-import inquirer
 import sys
 import os
 import argparse
@@ -31,31 +25,75 @@ import datetime
 import tarfile
 import textwrap
 import tarfile
+import collections
 import time
 import platform
 import concurrent.futures
 import hashlib
 import fnmatch
-import io
+import functools
+import gzip
 import math
 import shlex
 import shutil
 import tempfile
+import threading
 import subprocess
 import itertools
+import bisect
 import socket
-import inspect
 import getpass
+import importlib
+import importlib.metadata
 import pwd
 import grp
 import stat
+import struct
 import re
-import traceback
-import pkg_resources
+import urllib.parse
 from pathlib import Path
 
+
+class LazyModule:
+    '''Module imported on first attribute access. Used for modules that
+    only some commands need, to keep the CLI start-up short'''
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        try:
+            return getattr(self._module, attr)
+        except AttributeError:
+            # Submodule the package does not import itself (e.g. botocore.exceptions)
+            return importlib.import_module(f'{self._name}.{attr}')
+
+
+# Only needed by NIH Reporter, EC2 metadata, the config dialogs and debugging
+requests = LazyModule('requests')
+inquirer = LazyModule('inquirer')
+inspect = LazyModule('inspect')
+
+# Only needed by the cloud, index and idle monitor code paths
+boto3 = LazyModule('boto3')
+botocore = LazyModule('botocore')
+duckdb = LazyModule('duckdb')
+psutil = LazyModule('psutil')
+
 logger = ""
 
+# Froster only runs on Linux, checked once when the module is loaded
+IS_LINUX = sys.platform == 'linux'
+
+# Home folder of the current user, expanded once for the many '~' paths
+HOME_DIR = os.path.expanduser('~')
+
+# (timestamp, mountinfo mtime, {mount_point: fs_type}) of the last mount table parse
+mount_table_cache = (0, None, None)
+
 
 PROVIDERS_LIST = [
     'AWS',
@@ -150,6 +188,134 @@ IDRIVE_REGIONS = [
     "in-bn"
 ]
 
+# Options removed from the command line replayed on the EC2 instance
+EC2_DEPLOY_SKIP_OPTS = frozenset({'--aws', '-a', '--instance-type', '-i'})
+EC2_DEPLOY_SKIP_VALUE_OPTS = frozenset({'--instance-type', '-i'})
+
+# EC2 instance metadata entries that never change for an instance
+IMDS_IMMUTABLE_ENTRIES = frozenset(
+    {'instance-id', 'instance-type', 'ami-id', 'reservation-id', 'local-ipv4'})
+IMDS_TOKEN_TTL = 21600  # seconds
+
+# Multiplex ssh/scp calls to the same host over a single connection. The
+# commands only use the master socket, the master itself is started apart
+# (see AWSBoto._ssh_get_options) so it never holds their captured pipes
+SSH_OPTIONS = "-o StrictHostKeyChecking=no -o LogLevel=ERROR " \
+    "-o 'ControlPath=~/.ssh/froster-cm-%r@%h:%p'"
+SSH_MASTER_OPTIONS = "-o ControlMaster=yes -o ControlPersist=300 -f -N"
+
+# Static parts of the EC2 describe_instances filters
+EC2_FILTER_RUNNING = ({'Name': 'instance-state-name', 'Values': ('running',)},)
+EC2_FILTER_PUBLIC_IP_NAME = 'network-interface.addresses.association.public-ip'
+
+# Mount table used to find rclone mounts, and seconds a parse of it is reused
+MOUNTINFO_FILE = '/proc/self/mountinfo'
+MOUNT_TABLE_TTL = 1
+
+# Number of paths from which clean_path_list resolves them in threads
+CLEAN_PATH_PARALLEL_MIN = 32
+
+# key=value tokens of 'scontrol show ... --oneliner' output
+SLURM_KEY_VALUE_RE = re.compile(r'(\S+?)=(\S*)')
+
+# Seconds a process table walk of the idle monitor is reused
+PROCESS_SCAN_TTL = 10
+
+# Process table read directly by the idle monitor
+PROC_DIR = '/proc'
+
+# utmp(5) layout on Linux x86_64, used to detect logged in users
+UTMP_FILE = '/var/run/utmp'
+UTMP_RECORD_SIZE = 384
+UTMP_USER_PROCESS = 7
+
+# EC2 instance types with ephemeral (local) disk in GB, sorted by size
+EC2_INSTANCE_TYPES = (
+    ('t3a.micro', 5),
+    ('c5ad.large', 75),
+    ('i3en.large', 1250),
+    ('i3en.xlarge', 2500),
+    ('i3en.3xlarge', 7500),
+    ('i3en.6xlarge', 15000),
+    ('i3en.12xlarge', 30000),
+    ('i3en.24xlarge', 60000),
+)
+
+# EC2 cloud-init (root) script, formatted by AWSBoto._ec2_cloud_init_script
+EC2_CLOUD_INIT_TEMPLATE = textwrap.dedent('''
+    #! /bin/bash
+    dnf install -y gcc mdadm at vim wget python3-pip python3-psutil mc git docker lua lua-posix lua-devel tcl-devel nodejs-npm && dnf upgrade -y
+    bigdisks=$(lsblk -Pno NAME,FSTYPE,MOUNTPOINT,PKNAME | awk -F'"' '{{n[NR]=$2; f[NR]=$4 $6; p[$8]=1}} END {{for (i=1; i<=NR; i++) if (f[i]=="" && !(n[i] in p)) print "/dev/"n[i]}}')
+    numdisk=$(echo $bigdisks | wc -w)
+    mkdir /restored
+    if [[ $numdisk -gt 1 ]]; then
+      mdadm --create /dev/md0 --level=0 --raid-devices=$numdisk $bigdisks
+      mkfs -t xfs /dev/md0
+      mount /dev/md0 /restored
+    elif [[ $numdisk -eq 1 ]]; then
+      mkfs -t xfs $bigdisks
+      mount $bigdisks /restored
+    fi
+    chown ec2-user /restored
+    hostnamectl set-hostname froster
+    timedatectl set-timezone '{tz}'
+    loginctl enable-linger ec2-user
+    systemctl start atd
+    dnf group install -y 'Development Tools'
+    cd /tmp
+    wget https://sourceforge.net/projects/lmod/files/Lmod-8.7.tar.bz2
+    tar -xjf Lmod-8.7.tar.bz2
+    cd Lmod-8.7 && ./configure && make install
+    ''').strip()
+
+# EC2 ec2-user bootstrap script, formatted by AWSBoto._ec2_user_space_script
+EC2_USER_SPACE_TEMPLATE = textwrap.dedent('''
+    #! /bin/bash
+    mkdir -p ~/.froster/config
+    sleep 3 # give us some time to upload json to ~/.froster/config
+    echo 'PS1="\\u@froster:\\w$ "' >> ~/.bashrc
+    echo '#export EC2_INSTANCE_ID={instance_id}' >> ~/.bashrc
+    echo '#export AWS_DEFAULT_REGION={region}' >> ~/.bashrc
+    echo '#export TZ={tz}' >> ~/.bashrc
+    echo '#alias singularity="apptainer"' >> ~/.bashrc
+    cd /tmp
+    curl https://raw.githubusercontent.com/dirkpetersen/froster/main/install.sh | bash
+    froster config --monitor
+    aws configure set aws_access_key_id {ak}
+    aws configure set aws_secret_access_key {sk}
+    aws configure set region {region}
+    aws configure --profile {profile} set aws_access_key_id {ak}
+    aws configure --profile {profile} set aws_secret_access_key {sk}
+    aws configure --profile {profile} set region {region}
+    python3 -m pip install boto3
+    sed -i 's/aws_access_key_id [^ ]*/aws_access_key_id /' {bscript}
+    sed -i 's/aws_secret_access_key [^ ]*/aws_secret_access_key /' {bscript}
+    curl -s https://raw.githubusercontent.com/apptainer/apptainer/main/tools/install-unprivileged.sh | bash -s - ~/.local
+    curl -OkL https://repo.anaconda.com/miniconda/Miniconda3-latest-Linux-x86_64.sh
+    bash Miniconda3-latest-Linux-x86_64.sh -b
+    ~/miniconda3/bin/conda init bash
+    source ~/.bashrc
+    conda activate
+    echo '#! /bin/bash' > ~/.local/bin/get-public-ip
+    echo 'ETOKEN=$(curl -sX PUT "http://169.254.169.254/latest/api/token" -H "X-aws-ec2-metadata-token-ttl-seconds: 21600")' >> ~/.local/bin/get-public-ip
+    cp -f ~/.local/bin/get-public-ip ~/.local/bin/get-local-ip
+    echo 'curl -sH "X-aws-ec2-metadata-token: $ETOKEN" http://169.254.169.254/latest/meta-data/public-ipv4' >> ~/.local/bin/get-public-ip
+    echo 'curl -sH "X-aws-ec2-metadata-token: $ETOKEN" http://169.254.169.254/latest/meta-data/local-ipv4' >> ~/.local/bin/get-local-ip
+    chmod +x ~/.local/bin/get-public-ip
+    chmod +x ~/.local/bin/get-local-ip
+    ~/miniconda3/bin/conda install -y jupyterlab
+    ~/miniconda3/bin/conda install -y -c r r-irkernel r # R kernel and R for Jupyter
+    conda run bash -c "~/miniconda3/bin/jupyter-lab --ip=$(get-local-ip) --no-browser --autoreload --notebook-dir=~ > ~/.jupyter.log 2>&1" &
+    for i in $(seq 1 60); do grep -q "http.*token=" ~/.jupyter.log && break; sleep 1; done
+    sed "s/$(get-local-ip)/$(get-public-ip)/g" ~/.jupyter.log > ~/.jupyter-public.log
+    echo 'test -d /usr/local/lmod/lmod/init && source /usr/local/lmod/lmod/init/bash' >> ~/.bashrc
+    echo "" >> ~/.bash_profile
+    echo 'echo "Access JupyterLab:"' >> ~/.bash_profile
+    url=$(tail -n 7 ~/.jupyter-public.log | grep $(get-public-ip) |  tr -d ' ')
+    echo "echo \\" $url\\"" >> ~/.bash_profile
+    echo 'echo "type \\"conda deactivate\\" to leave current conda environment"' >> ~/.bash_profile
+    ''').strip()
+
 
 class ConfigManager:
     ''' Froster configuration manager
@@ -1450,6 +1616,32 @@ class AWSBoto:
             self.args = args
             self.cfg = cfg
             self.arch = arch
+            self._buckets_cache = None
+
+            # Parsed S3 Inventory reports, {bucket: (sorted keys, sizes) or None}
+            self._s3_inventory_cache = {}
+
+            # STS caller identity of the current session
+            self._caller_identity = None
+
+            # EC2 instance metadata (IMDSv2) token and immutable entries
+            self._imds_token = None
+            self._imds_token_expiry = 0
+            self._imds_cache = {}
+            self._imds_session = None
+
+            # Set to interrupt the idle monitor sampling
+            self._stop_evt = threading.Event()
+
+            # Last process walk of the idle monitor
+            self._last_scan_ts = float('-inf')
+            self._last_scan_result = []
+            # CPU ticks of each process at the previous walk, per pid
+            self._proc_cpu_ticks = {}
+
+            # Recent idle states of the idle monitor
+            self._idle_states = None
+            self._idle_state_lines = 0
 
             if hasattr(cfg, 'profile') and hasattr(cfg, 'endpoint'):
                 self.set_session(profile_name=cfg.profile,
@@ -1548,6 +1740,9 @@ class AWSBoto:
                                          CreateBucketConfiguration={'LocationConstraint': region})
             log(f'    ...bucket created\n')
 
+            # Invalidate the cached bucket list
+            self._invalidate_buckets_cache()
+
             if self.cfg.provider == 'AWS':
                 log(
                     f'\nApplying AES256 encryption to bucket {bucket_name}...')
@@ -1588,6 +1783,7 @@ class AWSBoto:
             # Delete the buckets if they exists
             if bucket_name in s3_buckets:
                 self.s3_client.delete_bucket(Bucket=bucket_name)
+                self._invalidate_buckets_cache()
                 log(f'Bucket {bucket_name} deleted\n')
             else:
                 log(f'Bucket {bucket_name} not found\n')
@@ -1598,10 +1794,17 @@ class AWSBoto:
             print_error()
             return False
 
+    def _invalidate_buckets_cache(self):
+        '''Forget the cached bucket list, call it whenever buckets change'''
+        self._buckets_cache = None
+
     def get_buckets(self):
-        ''' Get a list of all the froster buckets in the current session'''
+        ''' Get a list of all the buckets in the current session'''
 
         try:
+            if self._buckets_cache is not None:
+                return list(self._buckets_cache)
+
             # Get all the buckets
             existing_buckets = self.s3_client.list_buckets()
 
@@ -1609,12 +1812,11 @@ class AWSBoto:
             bucket_list = [bucket['Name']
                            for bucket in existing_buckets['Buckets']]
 
-            # Filter the bucket names and retrieve only froster-* buckets
-            # froster_bucket_list = [
-            #     x for x in bucket_list if x.startswith('froster-')]
+            # Cache the list for the rest of the session
+            self._buckets_cache = bucket_list
 
-            # Return the list of froster buckets
-            return bucket_list
+            # Return a copy so callers can modify it
+            return list(bucket_list)
 
         except Exception:
             print_error()
@@ -1679,14 +1881,24 @@ class AWSBoto:
             if not profile_name or not region or not endopoint_url:
                 return
 
-            # Initialize a Boto3 session using the configured profile
-            session = boto3.session.Session()
+            # Cached results belong to the previous session
+            self._invalidate_buckets_cache()
+            self._s3_inventory_cache = {}
+            self._caller_identity = None
 
             aws_access_key_id = self.cfg.get_credential(
                 profile=profile_name, key_name='aws_access_key_id')
             aws_secret_access_key = self.cfg.get_credential(
                 profile=profile_name, key_name='aws_secret_access_key')
 
+            # Initialize a Boto3 session using the configured profile
+            session = boto3.session.Session(
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                region_name=region
+            )
+            self.session = session
+
             # Initialize the AWS clients
             self.ce_client = session.client(
                 service_name='ce',
@@ -1758,6 +1970,9 @@ class AWSBoto:
         if hasattr(self, 'sts_client'):
             self.sts_client.close()
             del self.sts_client
+        self._invalidate_buckets_cache()
+        self._s3_inventory_cache.clear()
+        self._caller_identity = None
 
     def get_time_zone(self):
         '''Get the current time zone string from the system'''
@@ -1871,9 +2086,16 @@ class AWSBoto:
                 log(f'Error: No archive config found for folder {fld}')
                 continue
             # returns bucket(str), prefix(str), recursive(bool), glacier(bool)
+
+            # A recent S3 Inventory report is much cheaper than listing
+            inventory_size = self._get_s3_inventory_size(buc, pre, recur)
+            if inventory_size is not None:
+                total_size_bytes += inventory_size
+                continue
+
             # Use paginator to handle buckets with large number of objects
             paginator = self.s3_client.get_paginator('list_objects_v2')
-            for page in paginator.paginate(Bucket=buc, Prefix=pre):
+            for page in paginator.paginate(Bucket=buc, Prefix=pre, FetchOwner=False):
                 if "Contents" in page:  # Ensure there are objects under the specified prefix
                     for obj in page['Contents']:
                         key = obj['Key']
@@ -1883,6 +2105,84 @@ class AWSBoto:
         total_size_gib = total_size_bytes / (1024 ** 3)  # Convert bytes to GiB
         return total_size_gib
 
+    def _get_s3_inventory_size(self, bucket, prefix, recursive):
+        """
+        Sum the size of the objects under prefix using the latest
+        S3 Inventory report of the bucket, see _get_s3_inventory.
+
+        :return: Size in bytes, or None if no recent CSV inventory exists.
+        """
+        inventory = self._get_s3_inventory(bucket)
+        if inventory is None:
+            return None
+        keys, sizes = inventory
+
+        # Keys are sorted, the keys under prefix are a contiguous range
+        start = bisect.bisect_left(keys, prefix)
+        total_size_bytes = 0
+        depth = prefix.count('/')
+        for i in range(start, len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            if recursive or key.count('/') == depth:
+                total_size_bytes += sizes[i]
+        return total_size_bytes
+
+    def _get_s3_inventory(self, bucket, max_age_days=7):
+        """
+        Read the latest S3 Inventory report stored at
+        s3://<bucket>/inventory/<bucket>/froster/ once per bucket and session.
+
+        :return: (sorted keys, sizes) lists, or None if no recent CSV inventory exists.
+        """
+        if bucket not in self._s3_inventory_cache:
+            self._s3_inventory_cache[bucket] = self._read_s3_inventory(
+                bucket, max_age_days)
+        return self._s3_inventory_cache[bucket]
+
+    def _read_s3_inventory(self, bucket, max_age_days):
+        '''Download and parse the latest CSV inventory report of bucket'''
+        try:
+            inventory_prefix = f'inventory/{bucket}/froster/'
+            response = self.s3_client.list_objects_v2(
+                Bucket=bucket, Prefix=inventory_prefix, Delimiter='/')
+            reports = [p['Prefix'] for p in response.get('CommonPrefixes', [])]
+            if not reports:
+                return None
+
+            # Report folders are named YYYY-MM-DDTHH-MMZ
+            latest = max(reports)
+            report_date = datetime.datetime.strptime(
+                latest[len(inventory_prefix):][:10], '%Y-%m-%d')
+            if datetime.datetime.now() - report_date > datetime.timedelta(days=max_age_days):
+                return None
+
+            manifest = json.loads(self.s3_client.get_object(
+                Bucket=bucket, Key=latest + 'manifest.json')['Body'].read())
+            if manifest.get('fileFormat') != 'CSV':
+                return None
+            schema = [f.strip() for f in manifest['fileSchema'].split(',')]
+            key_idx = schema.index('Key')
+            size_idx = schema.index('Size')
+
+            objects = []
+            for inventory_file in manifest['files']:
+                body = self.s3_client.get_object(
+                    Bucket=bucket, Key=inventory_file['key'])['Body']
+                with gzip.open(body, 'rt') as f:
+                    for row in csv.reader(f):
+                        objects.append((urllib.parse.unquote_plus(row[key_idx]),
+                                        int(row[size_idx] or 0)))
+            objects.sort()
+
+            printdbg(f'Using S3 Inventory {latest} for {bucket}')
+            return [key for key, _ in objects], [size for _, size in objects]
+
+        except Exception as e:
+            printdbg(f'S3 Inventory not available for {bucket}: {e}')
+            return None
+
     def wait_for_ssh_ready(self, hostname, port=22, timeout=60):
         start_time = time.time()
         while time.time() - start_time < timeout:
@@ -1920,27 +2220,32 @@ class AWSBoto:
             bootstrap_restore += f'\nsudo chown ec2-user $(dirname "{folder}")'
             bootstrap_restore += f'\nln -s "{refolder}" "{folder}"'
 
-        # this block may need to be moved to a function
-        argl = ['--aws', '-a']
-        cmdlist = [item for item in sys.argv if item not in argl]
-        argl = ['--instance-type', '-i']  # if found remove option and next arg
-        cmdlist = [x for i, x in enumerate(cmdlist) if x
-                   not in argl and (i == 0 or cmdlist[i-1] not in argl)]
+        # Strip the EC2 options from the original command line in one pass
+        cmdlist = []
+        skip_next = False
+        for arg in sys.argv:
+            if skip_next:
+                skip_next = False
+                continue
+            if arg in EC2_DEPLOY_SKIP_OPTS:
+                # if found remove option and next arg
+                skip_next = arg in EC2_DEPLOY_SKIP_VALUE_OPTS
+                continue
+            cmdlist.append(arg)
         if not '--profile' in cmdlist and self.args.profile:
             cmdlist.insert(1, '--profile')
             cmdlist.insert(2, self.args.profile)
-        cmdline = 'froster ' + \
-            " ".join(map(shlex.quote, cmdlist[1:]))  # original cmdline
-        if not self.args.folders[0] in cmdline:
-            folders = '" "'.join(self.args.folders)
-            cmdline = f'{cmdline} "{folders}"'
+        if not any(self.args.folders[0] in arg for arg in cmdlist[1:]):
+            cmdlist += self.args.folders
+        cmdlist[0] = 'froster'
+        cmdline = shlex.join(cmdlist)  # original cmdline
         # end block
 
         log(f" will execute '{cmdline}' on {ip} ... ")
         bootstrap_restore += '\n' + cmdline
         # once retrieved from Glacier we need to restore this 5 and 12 hours from now
-        bootstrap_restore += '\n' + f"echo '{cmdline}' | at now + 5 hours"
-        bootstrap_restore += '\n' + f"echo '{cmdline}' | at now + 12 hours"
+        bootstrap_restore += '\n' + f"echo {shlex.quote(cmdline)} | at now + 5 hours"
+        bootstrap_restore += '\n' + f"echo {shlex.quote(cmdline)} | at now + 12 hours"
         ret = self.ssh_upload('ec2-user', ip,
                               bootstrap_restore, "bootstrap.sh", is_string=True)
         if ret.stdout or ret.stderr:
@@ -1964,12 +2269,43 @@ class AWSBoto:
         if ret.stdout or ret.stderr:
             log(ret.stdout, ret.stderr)
 
+        # Do not keep the multiplexed connection open after the deploy
+        self.ssh_close_master('ec2-user', ip)
+
         self.send_email_ses(self.cfg.email, self.cfg.email, 'Froster restore on EC2',
                             f'this command line was executed on host {ip}:\n{cmdline}')
 
+    def _get_caller_identity(self):
+        '''Get the STS caller identity, fetched once per session'''
+
+        if self._caller_identity is None:
+            identity = self.sts_client.get_caller_identity()
+            user_arn = identity['Arn']
+            is_root = ':root' in user_arn
+            self._caller_identity = {
+                'Account': identity['Account'],
+                'Arn': user_arn,
+                'IsRoot': is_root,
+                'UserName': 'root' if is_root else user_arn.split('/')[-1]
+            }
+        return self._caller_identity
+
     def _ec2_create_or_get_iam_policy(self, pol_name, pol_doc):
 
         policy_arn = None
+        try:
+            # Skip the create round-trip if the policy is already there
+            account_id = self._get_caller_identity()['Account']
+            policy_arn = f'arn:aws:iam::{account_id}:policy/{pol_name}'
+            self.iam_client.get_policy(PolicyArn=policy_arn)
+            log(f'Policy {pol_name} already exists')
+            return policy_arn
+        except self.iam_client.exceptions.NoSuchEntityException:
+            policy_arn = None
+        except Exception as e:
+            printdbg(f'Could not look up policy {pol_name}: {e}')
+            policy_arn = None
+
         try:
             response = self.iam_client.create_policy(
                 PolicyName=pol_name,
@@ -2086,6 +2422,9 @@ class AWSBoto:
 
         role_name = "FrosterEC2Role"
         try:
+            self.iam_client.get_role(RoleName=role_name)
+            log(f'Role {role_name} already exists.')
+        except self.iam_client.exceptions.NoSuchEntityException:
             self.iam_client.create_role(
                 RoleName=role_name,
                 AssumeRolePolicyDocument=json.dumps(trust_policy),
@@ -2108,21 +2447,15 @@ class AWSBoto:
         ses_policy = "arn:aws:iam::aws:policy/AmazonSESFullAccess"
 
         try:
-
-            self.iam_client.attach_role_policy(
-                RoleName=role_name,
-                PolicyArn=cost_explorer_policy
-            )
-
-            self.iam_client.attach_role_policy(
-                RoleName=role_name,
-                PolicyArn=ses_policy
-            )
-
-            self.iam_client.attach_role_policy(
-                RoleName=role_name,
-                PolicyArn=destruct_policy_arn
-            )
+            # Attaching policies is commutative, run the calls in parallel
+            policy_arns = [cost_explorer_policy,
+                           ses_policy, destruct_policy_arn]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(policy_arns)) as executor:
+                tasks = [executor.submit(self.iam_client.attach_role_policy,
+                                         RoleName=role_name, PolicyArn=arn)
+                         for arn in policy_arns]
+                for future in concurrent.futures.as_completed(tasks):
+                    future.result()
         except self.iam_client.exceptions.PolicyNotAttachableException as e:
             log(
                 f"Policy {e.policy_arn} is not attachable. Please check your permissions.")
@@ -2140,9 +2473,16 @@ class AWSBoto:
         # 3. Create an instance profile and associate it with the role
         instance_profile_name = "FrosterEC2Profile"
         try:
-            self.iam_client.create_instance_profile(
-                InstanceProfileName=instance_profile_name
-            )
+            try:
+                response = self.iam_client.get_instance_profile(
+                    InstanceProfileName=instance_profile_name)
+                if response['InstanceProfile']['Roles']:
+                    log(f'Profile {instance_profile_name} already exists.')
+                    return instance_profile_name
+            except self.iam_client.exceptions.NoSuchEntityException:
+                self.iam_client.create_instance_profile(
+                    InstanceProfileName=instance_profile_name
+                )
             self.iam_client.add_role_to_instance_profile(
                 InstanceProfileName=instance_profile_name,
                 RoleName=role_name
@@ -2162,15 +2502,12 @@ class AWSBoto:
             log('Other Error:', e)
             return None
 
-        # Give AWS a moment to propagate the changes
-        log('wait for 15 sec ...')
-        time.sleep(15)  # Wait for 15 seconds
-
+        # IAM returns the new profile at once, but EC2 only accepts it after
+        # it has propagated. _ec2_create_instance retries until it does
         return instance_profile_name
 
-    def _ec2_create_and_attach_security_group(self, instance_id):
+    def _ec2_get_or_create_security_group(self):
 
-        ec2_resource = self.session.resource('ec2')
         group_name = 'SSH-HTTP-ICMP'
 
         # Check if security group already exists
@@ -2222,6 +2559,15 @@ class AWSBoto:
                 ]
             )
 
+        return security_group_id
+
+    def _ec2_create_and_attach_security_group(self, instance_id, security_group_id=None):
+
+        ec2_resource = self.session.resource('ec2')
+
+        if not security_group_id:
+            security_group_id = self._ec2_get_or_create_security_group()
+
         # Attach the security group to the instance
         instance = ec2_resource.Instance(instance_id)
         current_security_groups = [sg['GroupId']
@@ -2236,36 +2582,81 @@ class AWSBoto:
 
     def _ec2_get_latest_amazon_linux2_ami(self):
 
+        # The AMI ID is cached on disk per region, architecture and ISO week
+        arch = 'x86_64'
+        region = self.cfg.get_region(self.cfg.profile)
+        year, week, _ = datetime.date.today().isocalendar()
+        cache_file = os.path.join(
+            self.cfg.config_dir, f'ami_cache_{region}_{arch}_{year}{week:02d}.json')
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    return json.load(f)['ImageId']
+            except Exception as e:
+                printdbg(f'Ignoring invalid AMI cache {cache_file}: {e}')
+
+        image_id = None
+
+        # The SSM public parameter resolves the latest AMI in one small call
+        try:
+            ssm_client = self.session.client('ssm', region_name=region)
+            image_id = ssm_client.get_parameter(
+                Name=f'/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-{arch}')['Parameter']['Value']
+        except Exception as e:
+            printdbg(f'SSM AMI lookup failed, using describe_images: {e}')
+            image_id = self._ec2_describe_latest_amazon_linux_ami(arch)
+
+        if not image_id:
+            return None
+
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump({'ImageId': image_id}, f)
+        except Exception as e:
+            printdbg(f'Could not write AMI cache {cache_file}: {e}')
+
+        return image_id
+
+    def _ec2_describe_latest_amazon_linux_ami(self, arch):
+
         response = self.ec2_client.describe_images(
             Filters=[
                 {'Name': 'name', 'Values': ['al2023-ami-*']},
                 {'Name': 'state', 'Values': ['available']},
-                {'Name': 'architecture', 'Values': ['x86_64']},
+                {'Name': 'architecture', 'Values': [arch]},
                 {'Name': 'virtualization-type', 'Values': ['hvm']}
             ],
-            Owners=['amazon']
+            # Amazon Linux official AMI account
+            Owners=['137112412989']
 
             # amzn2-ami-hvm-2.0.*-x86_64-gp2
             # al2023-ami-kernel-default-x86_64
 
         )
 
-        # Sort images by creation date to get the latest
-        images = sorted(response['Images'],
-                        key=lambda k: k['CreationDate'], reverse=True)
-        if images:
-            return images[0]['ImageId']
-        else:
-            return None
+        # Get the latest image by creation date
+        latest = max(response['Images'],
+                     key=lambda k: k['CreationDate'], default=None)
+        return latest['ImageId'] if latest else None
 
     def _create_progress_bar(self, max_value):
+        length = 50  # adjust as needed for the bar length
+        bar = "█" * length + '-' * length
+        step = max_value / 200
+        is_tty = sys.stdin.isatty()
+        last_printed = -max_value
+
         def show_progress_bar(iteration):
-            percent = ("{0:.1f}").format(100 * (iteration / float(max_value)))
-            length = 50  # adjust as needed for the bar length
+            nonlocal last_printed
+            # Rate-limit redraws to ~200 per bar
+            if iteration != max_value and iteration - last_printed < step:
+                return
+            last_printed = iteration
             filled_length = int(length * iteration // max_value)
-            bar = "█" * filled_length + '-' * (length - filled_length)
-            if sys.stdin.isatty():
-                log(f'\r|{bar}| {percent}%', end='\r')
+            if is_tty:
+                sys.stdout.write(
+                    f'\r|{bar[length - filled_length:2 * length - filled_length]}| {100 * iteration / max_value:.1f}%\r')
+                sys.stdout.flush()
             if iteration == max_value:
                 log()
 
@@ -2273,38 +2664,7 @@ class AWSBoto:
 
     def _ec2_cloud_init_script(self):
         # Define the User Data script
-        long_timezone = self.get_time_zone()
-        userdata = textwrap.dedent(f'''
-        #! /bin/bash
-        dnf install -y gcc mdadm
-        bigdisks=$(lsblk --fs --json | jq -r '.blockdevices[] | select(.children == null and .fstype == null) | "/dev/" + .name')
-        numdisk=$(echo $bigdisks | wc -w)
-        mkdir /restored
-        if [[ $numdisk -gt 1 ]]; then
-          mdadm --create /dev/md0 --level=0 --raid-devices=$numdisk $bigdisks
-          mkfs -t xfs /dev/md0
-          mount /dev/md0 /restored
-        elif [[ $numdisk -eq 1 ]]; then
-          mkfs -t xfs $bigdisks
-          mount $bigdisks /restored
-        fi
-        chown ec2-user /restored
-        dnf check-update
-        dnf update -y
-        dnf install -y at gcc vim wget python3-pip python3-psutil
-        hostnamectl set-hostname froster
-        timedatectl set-timezone '{long_timezone}'
-        loginctl enable-linger ec2-user
-        systemctl start atd
-        dnf upgrade
-        dnf install -y mc git docker lua lua-posix lua-devel tcl-devel nodejs-npm
-        dnf group install -y 'Development Tools'
-        cd /tmp
-        wget https://sourceforge.net/projects/lmod/files/Lmod-8.7.tar.bz2
-        tar -xjf Lmod-8.7.tar.bz2
-        cd Lmod-8.7 && ./configure && make install
-        ''').strip()
-        return userdata
+        return EC2_CLOUD_INIT_TEMPLATE.format_map({'tz': self.get_time_zone()})
 
     def _ec2_user_space_script(self, instance_id='', bscript='~/bootstrap.sh'):
         # Define script that will be installed by ec2-user
@@ -2312,53 +2672,15 @@ class AWSBoto:
         # TODO: Replicate the configuration of the user space script
 
         # short_timezone = datetime.datetime.now().astimezone().tzinfo
-        long_timezone = self.get_time_zone()
-        return textwrap.dedent(f'''
-        #! /bin/bash
-        mkdir -p ~/.froster/config
-        sleep 3 # give us some time to upload json to ~/.froster/config
-        echo 'PS1="\\u@froster:\\w$ "' >> ~/.bashrc
-        echo '#export EC2_INSTANCE_ID={instance_id}' >> ~/.bashrc
-        echo '#export AWS_DEFAULT_REGION={self.cfg.get_region(self.cfg.profile)}' >> ~/.bashrc
-        echo '#export TZ={long_timezone}' >> ~/.bashrc
-        echo '#alias singularity="apptainer"' >> ~/.bashrc
-        cd /tmp
-        curl https://raw.githubusercontent.com/dirkpetersen/froster/main/install.sh | bash
-        froster config --monitor
-        aws configure set aws_access_key_id {os.environ['AWS_ACCESS_KEY_ID']}
-        aws configure set aws_secret_access_key {os.environ['AWS_SECRET_ACCESS_KEY']}
-        aws configure set region {self.cfg.get_region(self.cfg.profile)}
-        aws configure --profile {self.cfg.profile} set aws_access_key_id {os.environ['AWS_ACCESS_KEY_ID']}
-        aws configure --profile {self.cfg.profile} set aws_secret_access_key {os.environ['AWS_SECRET_ACCESS_KEY']}
-        aws configure --profile {self.cfg.profile} set region {self.cfg.get_region(self.cfg.profile)}
-        python3 -m pip install boto3
-        sed -i 's/aws_access_key_id [^ ]*/aws_access_key_id /' {bscript}
-        sed -i 's/aws_secret_access_key [^ ]*/aws_secret_access_key /' {bscript}
-        curl -s https://raw.githubusercontent.com/apptainer/apptainer/main/tools/install-unprivileged.sh | bash -s - ~/.local
-        curl -OkL https://repo.anaconda.com/miniconda/Miniconda3-latest-Linux-x86_64.sh
-        bash Miniconda3-latest-Linux-x86_64.sh -b
-        ~/miniconda3/bin/conda init bash
-        source ~/.bashrc
-        conda activate
-        echo '#! /bin/bash' > ~/.local/bin/get-public-ip
-        echo 'ETOKEN=$(curl -sX PUT "http://169.254.169.254/latest/api/token" -H "X-aws-ec2-metadata-token-ttl-seconds: 21600")' >> ~/.local/bin/get-public-ip
-        cp -f ~/.local/bin/get-public-ip ~/.local/bin/get-local-ip
-        echo 'curl -sH "X-aws-ec2-metadata-token: $ETOKEN" http://169.254.169.254/latest/meta-data/public-ipv4' >> ~/.local/bin/get-public-ip
-        echo 'curl -sH "X-aws-ec2-metadata-token: $ETOKEN" http://169.254.169.254/latest/meta-data/local-ipv4' >> ~/.local/bin/get-local-ip
-        chmod +x ~/.local/bin/get-public-ip
-        chmod +x ~/.local/bin/get-local-ip
-        ~/miniconda3/bin/conda install -y jupyterlab
-        ~/miniconda3/bin/conda install -y -c r r-irkernel r # R kernel and R for Jupyter
-        conda run bash -c "~/miniconda3/bin/jupyter-lab --ip=$(get-local-ip) --no-browser --autoreload --notebook-dir=~ > ~/.jupyter.log 2>&1" &
-        sleep 60
-        sed "s/$(get-local-ip)/$(get-public-ip)/g" ~/.jupyter.log > ~/.jupyter-public.log
-        echo 'test -d /usr/local/lmod/lmod/init && source /usr/local/lmod/lmod/init/bash' >> ~/.bashrc
-        echo "" >> ~/.bash_profile
-        echo 'echo "Access JupyterLab:"' >> ~/.bash_profile
-        url=$(tail -n 7 ~/.jupyter-public.log | grep $(get-public-ip) |  tr -d ' ')
-        echo "echo \\" $url\\"" >> ~/.bash_profile
-        echo 'echo "type \\"conda deactivate\\" to leave current conda environment"' >> ~/.bash_profile
-        ''').strip()
+        return EC2_USER_SPACE_TEMPLATE.format_map({
+            'instance_id': instance_id,
+            'region': self.cfg.get_region(self.cfg.profile),
+            'profile': self.cfg.profile,
+            'bscript': bscript,
+            'tz': self.get_time_zone(),
+            'ak': os.environ['AWS_ACCESS_KEY_ID'],
+            'sk': os.environ['AWS_SECRET_ACCESS_KEY'],
+        })
 
     def _ec2_create_instance(self, required_space, iamprofile=None):
         # to avoid egress we are creating an EC2 instance
@@ -2372,24 +2694,14 @@ class AWSBoto:
         # i3en.large, 2 vcpu, 1.25Tib for $0.22
         # c5ad.large, 2 vcpu, 75GB, for $0.09
 
-        instance_types = {'i3en.24xlarge': 60000,
-                          'i3en.12xlarge': 30000,
-                          'i3en.6xlarge': 15000,
-                          'i3en.3xlarge': 7500,
-                          'i3en.xlarge': 2500,
-                          'i3en.large': 1250,
-                          'c5ad.large': 75,
-                          't3a.micro': 5,
-                          }
-
         ec2_resource = self.session.resource('ec2')
 
         if required_space > 1:
             required_space = required_space + 5  # avoid low disk space in micro instances
-        chosen_instance_type = None
-        for itype, space in instance_types.items():
-            if space > 1.5 * required_space:
-                chosen_instance_type = itype
+
+        # Pick the smallest instance type that fits the data
+        chosen_instance_type = next((itype for itype, space in EC2_INSTANCE_TYPES
+                                     if space > 1.5 * required_space), None)
 
         if self.args.instancetype:
             chosen_instance_type = self.args.instancetype
@@ -2405,15 +2717,15 @@ class AWSBoto:
         key_path = os.path.join(key_dir, f'{self.cfg.ssh_key_name}.pem')
         if not os.path.exists(key_path):
             try:
-                self.ec2_client.describe_key_pairs(
-                    KeyNames=[self.cfg.ssh_key_name])
-                # If the key pair exists, delete it
+                key_pair = ec2_resource.create_key_pair(
+                    KeyName=self.cfg.ssh_key_name)
+            except botocore.exceptions.ClientError as e:
+                if e.response['Error']['Code'] != 'InvalidKeyPair.Duplicate':
+                    raise
+                # The key pair exists in AWS but not locally, recreate it
                 self.ec2_client.delete_key_pair(KeyName=self.cfg.ssh_key_name)
-            except self.ec2_client.exceptions.ClientError:
-                # Key pair doesn't exist in AWS, no need to delete
-                pass
-            key_pair = ec2_resource.create_key_pair(
-                KeyName=self.cfg.ssh_key_name)
+                key_pair = ec2_resource.create_key_pair(
+                    KeyName=self.cfg.ssh_key_name)
             with open(key_path, 'w') as key_file:
                 key_file.write(key_pair.key_material)
             os.chmod(key_path, 0o640)  # Set file permission to 600
@@ -2421,8 +2733,7 @@ class AWSBoto:
         mykey_path = os.path.join(
             self.cfg.shared_dir, f'{self.cfg.ssh_key_name}-{self.cfg.whoami}.pem')
         if not os.path.exists(mykey_path):
-            shutil.copyfile(key_path, mykey_path)
-            os.chmod(mykey_path, 0o600)  # Set file permission to 600
+            self._ssh_copy_user_key(key_path, mykey_path)
 
         imageid = self._ec2_get_latest_amazon_linux2_ami()
         log(f'Using Image ID: {imageid}')
@@ -2436,25 +2747,39 @@ class AWSBoto:
             }
         log(f'IAM Instance profile: {iamprofile}.')
 
-        # iam_instance_profile = {}
-
         try:
-            # Create EC2 instance
-            instance = ec2_resource.create_instances(
-                ImageId=imageid,
-                MinCount=1,
-                MaxCount=1,
-                InstanceType=chosen_instance_type,
-                KeyName=self.cfg.ssh_key_name,
-                UserData=self._ec2_cloud_init_script(),
-                IamInstanceProfile=iam_instance_profile,
-                TagSpecifications=[
-                    {
-                        'ResourceType': 'instance',
-                        'Tags': [{'Key': 'Name', 'Value': 'FrosterSelfDestruct'}]
-                    }
-                ]
-            )[0]
+            # A newly created instance profile is rejected by EC2 for several
+            # seconds ("Invalid IAM Instance Profile name"), retry with backoff
+            delay = 2
+            while True:
+                try:
+                    # Create EC2 instance
+                    instance = ec2_resource.create_instances(
+                        ImageId=imageid,
+                        MinCount=1,
+                        MaxCount=1,
+                        InstanceType=chosen_instance_type,
+                        KeyName=self.cfg.ssh_key_name,
+                        UserData=self._ec2_cloud_init_script(),
+                        IamInstanceProfile=iam_instance_profile,
+                        TagSpecifications=[
+                            {
+                                'ResourceType': 'instance',
+                                'Tags': [{'Key': 'Name', 'Value': 'FrosterSelfDestruct'},
+                                         # tag the instance for cost explorer
+                                         {'Key': 'Froster/Owner', 'Value': self.cfg.whoami}]
+                            }
+                        ]
+                    )[0]
+                    break
+                except botocore.exceptions.ClientError as e:
+                    error = e.response['Error']
+                    if (delay > 32 or error['Code'] != 'InvalidParameterValue' or
+                            'iaminstanceprofile' not in error.get('Message', '').lower()):
+                        raise
+                    log(f'wait {delay} sec for the instance profile to propagate ...')
+                    time.sleep(delay)
+                    delay *= 2
         except botocore.exceptions.ClientError as e:
             error_code = e.response['Error']['Code']
             if error_code == 'AccessDenied':
@@ -2470,44 +2795,52 @@ class AWSBoto:
         # Use a waiter to ensure the instance is running before trying to access its properties
         instance_id = instance.id
 
-        # tag the instance for cost explorer
-        tag = {
-            'Key': 'INSTANCE_ID',
-            'Value': instance_id
-        }
-        try:
-            ec2_resource.create_tags(Resources=[instance_id], Tags=[tag])
-        except Exception as e:
-            printdbg('Error creating Tags: {e}')
-
         log(f'Launching instance {instance_id} ... please wait ...')
 
         max_wait_time = 300  # seconds
         delay_time = 10  # check every 10 seconds, adjust as needed
         max_attempts = max_wait_time // delay_time
 
-        waiter = self.ec2_client.get_waiter('instance_running')
-        progress = self._create_progress_bar(max_attempts)
+        def wait_until_running():
+            waiter = self.ec2_client.get_waiter('instance_running')
+            progress = self._create_progress_bar(max_attempts)
+            attempt = 0
 
-        for attempt in range(max_attempts):
+            # Tick the progress bar on every poll made by the waiter
+            def progress_tick(**kwargs):
+                nonlocal attempt
+                progress(min(attempt, max_attempts - 1))
+                attempt += 1
+
+            event_name = 'before-call.ec2.DescribeInstances'
+            self.ec2_client.meta.events.register(
+                event_name, progress_tick, unique_id='froster-waiter-progress')
             try:
                 waiter.wait(InstanceIds=[instance_id], WaiterConfig={
-                            'Delay': delay_time, 'MaxAttempts': 1})
-                progress(attempt)
-                break
-            except botocore.exceptions.WaiterError:
-                progress(attempt)
-                continue
-        log('')
+                            'Delay': delay_time, 'MaxAttempts': max_attempts})
+            except botocore.exceptions.WaiterError as e:
+                log(f'\nInstance {instance_id} not running yet: {e}')
+            finally:
+                self.ec2_client.meta.events.unregister(
+                    event_name, unique_id='froster-waiter-progress')
+            log('')
+
+        # The security group does not depend on the instance state,
+        # set it up while the instance is booting
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            sg_future = executor.submit(self._ec2_get_or_create_security_group)
+            wait_future = executor.submit(wait_until_running)
+            for future in concurrent.futures.as_completed([sg_future, wait_future]):
+                future.result()
+
         instance.reload()
 
         grpid = self._ec2_create_and_attach_security_group(
-            instance_id)
+            instance_id, sg_future.result())
         if grpid:
             log(f'Security Group "{grpid}" attached.')
         else:
             log('No Security Group ID created.')
-        instance.wait_until_running()
         log(f'Instance IP: {instance.public_ip_address}')
 
         # Save the last instance IP address
@@ -2515,18 +2848,20 @@ class AWSBoto:
 
         return instance_id, instance.public_ip_address
 
-    def ec2_terminate_instance(self, ip):
-        # terminate instance
+    def ec2_terminate_instance(self, ips):
+        # terminate instances
         # with ephemeral (local) disk for a temporary restore
+        # ips can be a single or a list of public IP addresses or instance IDs
+
+        if isinstance(ips, str):
+            ips = [ips]
 
-        # ips = self.ec2_list_ips(self, 'Name', 'FrosterSelfDestruct')
-        # Use describe_instances with a filter for the public IP address to find the instance ID
-        filters = [{
-            'Name': 'network-interface.addresses.association.public-ip',
-            'Values': [ip]
-        }]
+        instance_ids = [x for x in ips if x.startswith('i-')]
+        raw_ips = [x for x in ips if not x.startswith('i-')]
 
-        if not ip.startswith('i-'):  # this an ip and not an instance ID
+        if raw_ips:  # these are ips and not instance IDs
+            # Resolve all the public IP addresses in a single call
+            filters = [{'Name': EC2_FILTER_PUBLIC_IP_NAME, 'Values': raw_ips}]
             try:
                 response = self.ec2_client.describe_instances(Filters=filters)
             except botocore.exceptions.ClientError as e:
@@ -2535,17 +2870,26 @@ class AWSBoto:
             # Check if any instances match the criteria
             instances = [instance for reservation in response['Reservations']
                          for instance in reservation['Instances']]
-            if not instances:
-                log(f"No EC2 instance found with public IP: {ip}")
-                return
-            # Extract instance ID from the instance
-            instance_id = instances[0]['InstanceId']
-        else:
-            instance_id = ip
-        # Terminate the instance
-        self.ec2_client.terminate_instances(InstanceIds=[instance_id])
+            found_ips = {instance.get('PublicIpAddress')
+                         for instance in instances}
+            for ip in raw_ips:
+                if ip not in found_ips:
+                    log(f"No EC2 instance found with public IP: {ip}")
+            # Extract instance IDs from the instances
+            instance_ids += [instance['InstanceId'] for instance in instances]
+
+        if not instance_ids:
+            return
+
+        # Terminate all the instances at once
+        self.ec2_client.terminate_instances(InstanceIds=instance_ids)
 
-        log(f"EC2 Instance {instance_id} ({ip}) is being terminated !")
+        # Close the multiplexed ssh connections to the terminated hosts
+        for ip in raw_ips:
+            self.ssh_close_master('ec2-user', ip)
+
+        log(
+            f"EC2 Instance(s) {', '.join(instance_ids)} ({', '.join(ips)}) being terminated !")
 
     def ec2_list_instances(self, tag_name, tag_value):
         """
@@ -2556,20 +2900,25 @@ class AWSBoto:
         """
 
         # Define the filter
-        filters = [
-            {
-                'Name': 'tag:' + tag_name,
-                'Values': [tag_value]
-            },
-            {
-                'Name': 'instance-state-name',
-                'Values': ['running']
-            }
-        ]
+        filters = [{'Name': 'tag:' + tag_name, 'Values': [tag_value]},
+                   *EC2_FILTER_RUNNING]
 
-        # Make the describe instances call
+        ilist = []
+
+        # Stream the describe instances pages
         try:
-            response = self.ec2_client.describe_instances(Filters=filters)
+            paginator = self.ec2_client.get_paginator('describe_instances')
+            pages = paginator.paginate(
+                Filters=filters, PaginationConfig={'PageSize': 1000})
+
+            # Extract IP addresses
+            for page in pages:
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        row = [instance.get('PublicIpAddress', ''),
+                               instance['InstanceId'],
+                               instance['InstanceType']]
+                        ilist.append(row)
         except botocore.exceptions.ClientError as e:
             error_code = e.response['Error']['Code']
             if error_code == 'AccessDenied':
@@ -2579,16 +2928,25 @@ class AWSBoto:
                 log(f'Client Error: {e}')
             return []
         # An error occurred (AuthFailure) when calling the DescribeInstances operation: AWS was not able to validate the provided access credentials
-        ilist = []
-        # Extract IP addresses
-        for reservation in response['Reservations']:
-            for instance in reservation['Instances']:
-                row = [instance['PublicIpAddress'],
-                       instance['InstanceId'],
-                       instance['InstanceType']]
-                ilist.append(row)
         return ilist
 
+    def _ssh_copy_user_key(self, key_path, mykey_path):
+        '''Create the per-user copy of the ssh key with 600 permissions'''
+
+        # A hard link shares mode and owner with the shared key, so it is only
+        # usable when the shared key is already private to the current user
+        key_stat = os.stat(key_path)
+        if key_stat.st_uid == os.getuid() and not key_stat.st_mode & 0o077:
+            try:
+                os.link(key_path, mykey_path)
+                return
+            except OSError:
+                # Cross-device or unsupported, fall back to a copy
+                pass
+
+        shutil.copyfile(key_path, mykey_path)
+        os.chmod(mykey_path, 0o600)  # Set file permission to 600
+
     def _ssh_get_key_path(self):
         key_path = os.path.join(self.cfg.shared_dir,
                                 f'{self.cfg.ssh_key_name}.pem')
@@ -2599,14 +2957,46 @@ class AWSBoto:
                 f'{key_path} does not exist. Please create it by launching "froster restore --aws"')
             sys.exit
         if not os.path.exists(mykey_path):
-            shutil.copyfile(key_path, mykey_path)
-            os.chmod(mykey_path, 0o600)  # Set file permission to 600
+            self._ssh_copy_user_key(key_path, mykey_path)
         return mykey_path
 
+    def _ssh_get_options(self, user, host, key_path):
+        '''Get the ssh options, starting a master connection to the host
+        if there is none yet'''
+
+        # The control sockets live in ~/.ssh
+        ssh_dir = os.path.expanduser('~/.ssh')
+        if not os.path.isdir(ssh_dir):
+            os.makedirs(ssh_dir, mode=0o700, exist_ok=True)
+
+        try:
+            check = subprocess.run(f"ssh {SSH_OPTIONS} -O check {user}@{host}", shell=True,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if check.returncode != 0:
+                # The backgrounded master must not inherit any pipe of ours.
+                # If it cannot start, the commands connect on their own
+                subprocess.run(f"ssh {SSH_OPTIONS} {SSH_MASTER_OPTIONS} -i '{key_path}' {user}@{host}",
+                               shell=True, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception:
+            printdbg(f'Could not start the ssh master connection to {host}')
+
+        return SSH_OPTIONS
+
+    def ssh_close_master(self, user, host):
+        """Close the master SSH connection to the remote server."""
+        cmd = f"ssh {SSH_OPTIONS} -O exit {user}@{host}"
+        try:
+            return subprocess.run(
+                cmd, shell=True, capture_output=True, text=True)
+        except Exception:
+            log(f'Error executing "{cmd}."')
+        return None
+
     def ssh_execute(self, user, host, command=None):
         """Execute an SSH command on the remote server."""
-        SSH_OPTIONS = "-o StrictHostKeyChecking=no"
         key_path = self._ssh_get_key_path()
+        SSH_OPTIONS = self._ssh_get_options(user, host, key_path)
         cmd = f"ssh {SSH_OPTIONS} -i '{key_path}' {user}@{host}"
         if command:
             cmd += f" '{command}'"
@@ -2623,8 +3013,8 @@ class AWSBoto:
 
     def ssh_upload(self, user, host, local_path, remote_path, is_string=False):
         """Upload a file to the remote server using SCP."""
-        SSH_OPTIONS = "-o StrictHostKeyChecking=no"
         key_path = self._ssh_get_key_path()
+        SSH_OPTIONS = self._ssh_get_options(user, host, key_path)
         if is_string:
             # the local_path is actually a string that needs to go into temp file
             with tempfile.NamedTemporaryFile(mode='w+', delete=False) as temp:
@@ -2643,8 +3033,8 @@ class AWSBoto:
 
     def ssh_download(self, user, host, remote_path, local_path):
         """Upload a file to the remote server using SCP."""
-        SSH_OPTIONS = "-o StrictHostKeyChecking=no"
         key_path = self._ssh_get_key_path()
+        SSH_OPTIONS = self._ssh_get_options(user, host, key_path)
         cmd = f"scp {SSH_OPTIONS} -i '{key_path}' {user}@{host}:{remote_path} {local_path}"
         try:
             result = subprocess.run(
@@ -2654,22 +3044,19 @@ class AWSBoto:
             log(f'Error executing "{cmd}."')
         return None
 
-    def send_email_ses(self, sender, to, subject, body):
-        '''Using AWS ses service to send emails'''
+    def _ses_get_verified_email_addresses(self, max_age=3600):
+        '''Get the SES verified email addresses, cached on disk for max_age seconds'''
 
-        # Check if required parameters are provided
-        if not sender:
-            raise ValueError('Sender email address is required.')
-        if not to:
-            raise ValueError('Recipient email address is required.')
-        if not subject:
-            raise ValueError('Email subject is required.')
-        if not body:
-            raise ValueError('Email body is required.')
+        cache_file = os.path.join(self.cfg.config_dir, 'ses_verified.json')
 
-        ses_verify_requests_sent = self.cfg.ses_verify_requests_sent
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+            if time.time() - cache['fetched_at'] < max_age:
+                return set(cache['addresses'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
 
-        verified_email_addr = []
         try:
             response = self.ses_client.list_verified_email_addresses()
             verified_email_addr = response.get('VerifiedEmailAddresses', [])
@@ -2680,35 +3067,66 @@ class AWSBoto:
                     f'Access denied to SES advanced features! Please check your IAM permissions. \nError: {e}')
             else:
                 log(f'Client Error: {e}')
+            return set()
         except Exception as e:
             log(f'Other Error: {e}')
+            return set()
+
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump({'addresses': verified_email_addr,
+                           'fetched_at': time.time()}, f)
+        except OSError as e:
+            printdbg(f'Could not write SES cache {cache_file}: {e}')
+
+        return set(verified_email_addr)
+
+    def send_email_ses(self, sender, to, subject, body):
+        '''Using AWS ses service to send emails'''
+
+        # Check if required parameters are provided
+        if not sender:
+            raise ValueError('Sender email address is required.')
+        if not to:
+            raise ValueError('Recipient email address is required.')
+        if not subject:
+            raise ValueError('Email subject is required.')
+        if not body:
+            raise ValueError('Email body is required.')
+
+        ses_verify_requests_sent = self.cfg.ses_verify_requests_sent
 
         checks = [sender, to]
         checks = list(set(checks))  # remove duplicates
-        email_list = []
 
-        try:
-            for check in checks:
-                if check not in verified_email_addr and check not in ses_verify_requests_sent:
-                    response = self.ses_client.verify_email_identity(
-                        EmailAddress=check)
-                    email_list.append(check)
-                    log(
-                        f'{check} was used for the first time, verification email sent.')
-                    log(
-                        'Please have {check} check inbox and confirm email from AWS.\n')
+        verified_email_addr = self._ses_get_verified_email_addresses()
 
-        except botocore.exceptions.ClientError as e:
-            error_code = e.response['Error']['Code']
-            if error_code == 'AccessDenied':
-                printdbg(
-                    f'Access denied to SES advanced features! Please check your IAM permissions. \nError: {e}')
-            else:
-                log(f'Client Error: {e}')
-        except Exception as e:
-            log(f'Other Error: {e}')
+        # Nothing to verify if all addresses are known to be verified
+        if not all(check in verified_email_addr for check in checks):
+            email_list = []
+
+            try:
+                for check in checks:
+                    if check not in verified_email_addr and check not in ses_verify_requests_sent:
+                        response = self.ses_client.verify_email_identity(
+                            EmailAddress=check)
+                        email_list.append(check)
+                        log(
+                            f'{check} was used for the first time, verification email sent.')
+                        log(
+                            'Please have {check} check inbox and confirm email from AWS.\n')
 
-        self.cfg.ses_verify_requests_sent(email_list)
+            except botocore.exceptions.ClientError as e:
+                error_code = e.response['Error']['Code']
+                if error_code == 'AccessDenied':
+                    printdbg(
+                        f'Access denied to SES advanced features! Please check your IAM permissions. \nError: {e}')
+                else:
+                    log(f'Client Error: {e}')
+            except Exception as e:
+                log(f'Other Error: {e}')
+
+            self.cfg.ses_verify_requests_sent(email_list)
 
         try:
             response = self.ses_client.send_email(
@@ -2901,34 +3319,54 @@ class AWSBoto:
 
         # request 'local-hostname', 'public-hostname', 'local-ipv4', 'public-ipv4'
 
+        # These entries never change during the lifetime of an instance
+        if metadata_entry in IMDS_IMMUTABLE_ENTRIES and metadata_entry in self._imds_cache:
+            return self._imds_cache[metadata_entry]
+
         # Define the base URL for the EC2 metadata service
         base_url = "http://169.254.169.254/latest/meta-data/"
 
-        # Request a token with a TTL of 60 seconds
-        token_url = "http://169.254.169.254/latest/api/token"
-        token_headers = {"X-aws-ec2-metadata-token-ttl-seconds": "60"}
-        try:
-            token_response = requests.put(
-                token_url, headers=token_headers, timeout=2)
-        except Exception as e:
-            log(f'Other Error: {e}')
-            return ""
-        token = token_response.text
+        # Keep a single connection to the metadata service alive
+        if self._imds_session is None:
+            self._imds_session = requests.Session()
+            self._imds_session.mount(
+                "http://169.254.169.254",
+                requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+        # Request a token with a TTL of 6 hours and reuse it until it expires
+        if not self._imds_token or time.time() >= self._imds_token_expiry - 5:
+            token_url = "http://169.254.169.254/latest/api/token"
+            token_headers = {
+                "X-aws-ec2-metadata-token-ttl-seconds": str(IMDS_TOKEN_TTL)}
+            try:
+                token_response = self._imds_session.put(
+                    token_url, headers=token_headers, timeout=2)
+            except Exception as e:
+                log(f'Other Error: {e}')
+                return ""
+            self._imds_token = token_response.text
+            self._imds_token_expiry = time.time() + IMDS_TOKEN_TTL
 
         # Use the token to retrieve the specified metadata entry
-        headers = {"X-aws-ec2-metadata-token": token}
+        headers = {"X-aws-ec2-metadata-token": self._imds_token}
         try:
-            response = requests.get(
+            response = self._imds_session.get(
                 base_url + metadata_entry, headers=headers, timeout=2)
         except Exception as e:
             log(f'Other Error: {e}')
             return ""
 
         if response.status_code != 200:
+            if response.status_code == 401:
+                # The token is no longer valid, request a new one next time
+                self._imds_token = None
             log(
                 f"Error: Failed to retrieve metadata for entry: {metadata_entry}. HTTP Status Code: {response.status_code}")
             return ""
 
+        if metadata_entry in IMDS_IMMUTABLE_ENTRIES:
+            self._imds_cache[metadata_entry] = response.text
+
         return response.text
 
     # TODO: OHSU-97: Implement cost monitoring and email sending
@@ -2991,6 +3429,20 @@ class AWSBoto:
 
     def _monitor_users_logged_in(self):
         """Check if any users are logged in."""
+
+        # Read utmp directly instead of forking who(1)
+        try:
+            with open(UTMP_FILE, 'rb') as f:
+                data = f.read()
+            for offset in range(0, len(data) - UTMP_RECORD_SIZE + 1, UTMP_RECORD_SIZE):
+                ut_type, = struct.unpack_from('h', data, offset)
+                if ut_type == UTMP_USER_PROCESS:
+                    log('froster-monitor: Not idle, user logged in')
+                    return True  # Users are logged in
+            return False
+        except OSError:
+            pass
+
         try:
             output = subprocess.check_output(
                 ['who']).decode('utf-8', errors='ignore')
@@ -3016,20 +3468,122 @@ class AWSBoto:
         DISK_WRITE_THRESHOLD = 100000  # bytes per second
         PROCESS_CPU_THRESHOLD = 10  # percent (for individual processes)
         PROCESS_MEM_THRESHOLD = 10  # percent (for individual processes)
-        DISK_WRITE_EXCLUSIONS = ["systemd", "systemd-journald",
-                                 "chronyd", "sshd", "auditd", "agetty"]
+        DISK_WRITE_EXCLUSIONS = frozenset(["systemd", "systemd-journald",
+                                           "chronyd", "sshd", "auditd", "agetty"])
+
+        def sample_activity(window):
+            '''Sample CPU, disk write and network rates over window seconds'''
+            psutil.cpu_percent(interval=None)  # prime the CPU counters
+            io_start = psutil.disk_io_counters()
+            net_start = psutil.net_io_counters()
+            t0 = time.monotonic()
+            # Cancellable wait, set self._stop_evt to stop sampling early
+            self._stop_evt.wait(window)
+            cpu_percent = psutil.cpu_percent(interval=None)
+            io_end = psutil.disk_io_counters()
+            net_end = psutil.net_io_counters()
+            elapsed = max(time.monotonic() - t0, 1e-3)
+            return (cpu_percent,
+                    (io_end.write_bytes - io_start.write_bytes) / elapsed,
+                    (net_end.bytes_sent - net_start.bytes_sent) / elapsed,
+                    (net_end.bytes_recv - net_start.bytes_recv) / elapsed)
+
+        def read_write_bytes(pid):
+            '''Read write_bytes from /proc/<pid>/io, 0 if not permitted'''
+            try:
+                with open(f'{PROC_DIR}/{pid}/io', 'rb') as f:
+                    for line in f:
+                        if line.startswith(b'write_bytes:'):
+                            return int(line.split()[1])
+            except OSError:
+                pass
+            return 0
+
+        def scan_processes(with_io=False):
+            '''Walk /proc collecting name, CPU percent and, if with_io,
+            disk writes (None otherwise) of every process. CPU percent is
+            measured since the previous walk, or over the process lifetime
+            for new processes. The result is reused for PROCESS_SCAN_TTL
+            seconds'''
+            if time.monotonic() - self._last_scan_ts >= PROCESS_SCAN_TTL:
+                clk_tck = os.sysconf('SC_CLK_TCK')
+                with open(f'{PROC_DIR}/uptime', 'rb') as f:
+                    uptime = float(f.read().split()[0])
+                processes = []
+                cpu_ticks = {}
+                with os.scandir(PROC_DIR) as entries:
+                    for entry in entries:
+                        if not entry.name.isdigit():
+                            continue
+                        pid = entry.name
+                        try:
+                            # A single read of /proc/<pid>/stat has all we need
+                            with open(f'{PROC_DIR}/{pid}/stat', 'rb') as f:
+                                stat_line = f.read().decode(errors='replace')
+                        except OSError:
+                            continue
+                        # comm is field 2, in parentheses and may contain spaces
+                        name = stat_line[stat_line.find('(') + 1:stat_line.rfind(')')]
+                        if name in DISK_WRITE_EXCLUSIONS:
+                            continue
+                        # Fields from 3 (state) on: utime is 14, stime 15
+                        # and starttime 22
+                        fields = stat_line[stat_line.rfind(')') + 2:].split()
+                        ticks = int(fields[11]) + int(fields[12])
+                        cpu_ticks[pid] = (ticks, uptime)
+                        if pid in self._proc_cpu_ticks:
+                            prev_ticks, prev_uptime = self._proc_cpu_ticks[pid]
+                        else:
+                            prev_ticks, prev_uptime = 0, int(
+                                fields[19]) / clk_tck
+                        elapsed = uptime - prev_uptime
+                        cpu = 100 * (ticks - prev_ticks) / clk_tck / \
+                            elapsed if elapsed > 0 else 0.0
+                        # /proc/<pid>/io is a separate read that is
+                        # often denied, only open it for the disk check
+                        write_bytes = read_write_bytes(pid) if with_io else None
+                        processes.append((name, cpu, write_bytes))
+                self._proc_cpu_ticks = cpu_ticks
+                self._last_scan_result = processes
+                self._last_scan_ts = time.monotonic()
+            return self._last_scan_result
+
+        def is_io_busy(write_per_second, bytes_sent_per_second, bytes_recv_per_second):
+            '''Check disk and network activity against the thresholds'''
+
+            # Check I/O Activity
+            if write_per_second > DISK_WRITE_THRESHOLD:
+                # The threshold was crossed, a cached walk is not good enough
+                self._last_scan_ts = float('-inf')
+                for name, cpu, write_bytes in scan_processes(with_io=True):
+                    if write_bytes > 0:
+                        log(
+                            f'froster-monitor:io bytes written: {write_bytes}')
+                        return True
+
+            # Check Network Activity
+            if bytes_sent_per_second > NET_WRITE_THRESHOLD or \
+                    bytes_recv_per_second > NET_READ_THRESHOLD:
+                log(
+                    f'froster-monitor:net bytes recv: {bytes_recv_per_second}')
+                return True
+
+            return False
+
+        # Check the cheapest signals first and return as soon as one is busy
 
         # Not idle if any users are logged in
         if self._monitor_users_logged_in():
             log(f'froster-monitor: Not idle: user(s) logged in')
-            # return self._monitor_save_idle_state(False, min_idle_cnt)
+            return self._monitor_save_idle_state(False, min_idle_cnt)
+
+        # Quick disk and network check over a short window
+        _, *io_rates = sample_activity(1)
+        if is_io_busy(*io_rates):
+            return self._monitor_save_idle_state(False, min_idle_cnt)
 
-        # CPU, Time I/O and Network Activity
-        io_start = psutil.disk_io_counters()
-        net_start = psutil.net_io_counters()
-        cpu_percent = psutil.cpu_percent(interval=interval)
-        io_end = psutil.disk_io_counters()
-        net_end = psutil.net_io_counters()
+        # CPU, Time I/O and Network Activity over the full interval
+        cpu_percent, *io_rates = sample_activity(interval)
 
         log(f'froster-monitor: Current CPU% {cpu_percent}')
 
@@ -3038,42 +3592,19 @@ class AWSBoto:
             log(f'froster-monitor: Not idle: CPU% {cpu_percent}')
             # return self._monitor_save_idle_state(False, min_idle_cnt)
 
-        # Check I/O Activity
-        write_diff = io_end.write_bytes - io_start.write_bytes
-        write_per_second = write_diff / interval
-
-        if write_per_second > DISK_WRITE_THRESHOLD:
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'] in DISK_WRITE_EXCLUSIONS:
-                    continue
-                try:
-                    if proc.io_counters().write_bytes > 0:
-                        log(
-                            f'froster-monitor:io bytes written: {proc.io_counters().write_bytes}')
-                        return self._monitor_save_idle_state(False, min_idle_cnt)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-
-        # Check Network Activity
-        bytes_sent_diff = net_end.bytes_sent - net_start.bytes_sent
-        bytes_recv_diff = net_end.bytes_recv - net_start.bytes_recv
-
-        bytes_sent_per_second = bytes_sent_diff / interval
-        bytes_recv_per_second = bytes_recv_diff / interval
-
-        if bytes_sent_per_second > NET_WRITE_THRESHOLD or \
-                bytes_recv_per_second > NET_READ_THRESHOLD:
-            log(
-                f'froster-monitor:net bytes recv: {bytes_recv_per_second}')
+        if is_io_busy(*io_rates):
             return self._monitor_save_idle_state(False, min_idle_cnt)
 
-        # Examine Running Processes for CPU and Memory Usage
-        for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent']):
-            if proc.info['name'] not in DISK_WRITE_EXCLUSIONS:
-                if proc.info['cpu_percent'] > PROCESS_CPU_THRESHOLD:
+        # Examine Running Processes for CPU Usage, reusing the walk above.
+        # This check does not change the idle state, so only pay for the
+        # process walk when debugging
+        if os.environ.get('DEBUG') == '1':
+            for name, cpu, write_bytes in scan_processes():
+                if cpu > PROCESS_CPU_THRESHOLD:
                     log(
-                        f'froster-monitor: Not idle: CPU% {proc.info["cpu_percent"]}')
+                        f'froster-monitor: Not idle: CPU% {cpu} ({name})')
                     # return False
+                    break
                 # disabled this idle checker
                 # if proc.info['memory_percent'] > PROCESS_MEM_THRESHOLD:
                 #    log(f'froster-monitor: Not idle: MEM% {proc.info["memory_percent"]}')
@@ -3086,26 +3617,46 @@ class AWSBoto:
     def _monitor_save_idle_state(self, is_system_idle, min_idle_cnt):
         IDLE_STATE_FILE = os.path.join(os.getenv('TMPDIR', '/tmp'),
                                        'froster_idle_state.txt')
-        with open(IDLE_STATE_FILE, 'a') as file:
-            file.write('1\n' if is_system_idle else '0\n')
-        with open(IDLE_STATE_FILE, 'r') as file:
-            states = file.readlines()
-        count = 0
-        for state in reversed(states):
-            if state.strip() == '1':
-                count += 1
-            else:
-                break
-        return count >= min_idle_cnt
 
-    def _monitor_get_ec2_costs(self):
+        # Load the recent states once per process, the file is bounded in size
+        if self._idle_states is None or self._idle_states.maxlen != min_idle_cnt:
+            self._idle_states = collections.deque(maxlen=min_idle_cnt)
+            self._idle_state_lines = 0
+            try:
+                with open(IDLE_STATE_FILE, 'r') as file:
+                    for state in file:
+                        self._idle_states.append(state.strip() == '1')
+                        self._idle_state_lines += 1
+            except OSError:
+                pass
+
+        self._idle_states.append(is_system_idle)
+
+        if self._idle_state_lines >= 2 * min_idle_cnt:
+            # Truncate the file to the states that still matter
+            with open(IDLE_STATE_FILE, 'w') as file:
+                file.writelines('1\n' if state else '0\n'
+                                for state in self._idle_states)
+            self._idle_state_lines = len(self._idle_states)
+        else:
+            fd = os.open(IDLE_STATE_FILE,
+                         os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, b'1\n' if is_system_idle else b'0\n')
+            finally:
+                os.close(fd)
+            self._idle_state_lines += 1
+
+        return len(self._idle_states) == min_idle_cnt and all(self._idle_states)
+
+    def _monitor_get_ec2_costs(self, max_age=3600):
 
         # Identify current user/account
-        identity = self.sts_client.get_caller_identity()
+        identity = self._get_caller_identity()
         user_arn = identity['Arn']
 
         # Check if it's the root user
-        is_root = ":root" in user_arn
+        is_root = identity['IsRoot']
 
         # Dates for the current month and the last 24 hours
         today = datetime.datetime.today()
@@ -3113,100 +3664,91 @@ class AWSBoto:
             today.year, today.month, 1).date()
         yesterday = (today - datetime.timedelta(days=1)).date()
 
-        # Fetch EC2 cost of the current month
-        monthly_response = self.ce_client.get_cost_and_usage(
-            TimePeriod={
-                'Start': str(first_day_of_month),
-                'End': str(today.date())
-            },
-            Filter={
-                'Dimensions': {
-                    'Key': 'SERVICE',
-                    'Values': ['Amazon Elastic Compute Cloud - Compute']
-                }
-            },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-        )
-        monthly_cost = float(
-            monthly_response['ResultsByTime'][0]['Total']['UnblendedCost']['Amount'])
-        monthly_unit = monthly_response['ResultsByTime'][0]['Total']['UnblendedCost']['Unit']
+        # Cost Explorer data changes slowly and every request is charged,
+        # reuse the last results for max_age seconds
+        cache_key = f'{today.date()}|{user_arn}'
+        cache_file = os.path.join(self.cfg.config_dir, 'ce_costs_cache.json')
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+            if cache['key'] == cache_key and time.time() - cache['fetched_at'] < max_age:
+                costs = cache['costs']
+                costs[2] = {k: tuple(v) for k, v in costs[2].items()}
+                return tuple(costs)
+        except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError):
+            pass
+
+        # One daily query covers both the month and the last 24 hours
+        start = str(min(first_day_of_month, yesterday))
+        end = str(today.date())
+        service_filter = {
+            'Dimensions': {
+                'Key': 'SERVICE',
+                'Values': ['Amazon Elastic Compute Cloud - Compute']
+            }
+        }
+
+        def results_by_time(**kwargs):
+            # Results by day start, with GroupBy the groups of one day
+            # can be split across pages and are merged here
+            results = {}
+            params = dict(
+                TimePeriod={'Start': start, 'End': end},
+                Granularity='DAILY',
+                Metrics=['UnblendedCost'],
+                **kwargs)
+            while True:
+                response = self.ce_client.get_cost_and_usage(
+                    **params)
+                for result in response['ResultsByTime']:
+                    day = result['TimePeriod']['Start']
+                    if day in results:
+                        results[day].setdefault('Groups', []).extend(
+                            result.get('Groups', []))
+                    else:
+                        results[day] = result
+                if not response.get('NextPageToken'):
+                    return list(results.values())
+                params['NextPageToken'] = response['NextPageToken']
+
+        def in_month(result):
+            return result['TimePeriod']['Start'] >= str(first_day_of_month)
+
+        # Fetch EC2 cost of the current month grouped by instance type
+        account_results = results_by_time(
+            Filter=service_filter,
+            GroupBy=[{'Type': 'DIMENSION', 'Key': 'INSTANCE_TYPE'}])
+
+        monthly_cost = 0.0
+        monthly_unit = 'USD'
+        for result in account_results:
+            for group in result['Groups']:
+                monthly_unit = group['Metrics']['UnblendedCost']['Unit']
+                if in_month(result):
+                    monthly_cost += float(
+                        group['Metrics']['UnblendedCost']['Amount'])
+
+        # Cost of each EC2 instance type in the last 24 hours
+        daily_costs_by_instance = {group['Keys'][0]: (float(group['Metrics']['UnblendedCost']['Amount']),
+                                                      group['Metrics']['UnblendedCost']['Unit'])
+                                   for group in account_results[-1]['Groups']} if account_results else {}
 
         # If it's the root user, the whole account's costs are assumed to be caused by root.
         if is_root:
             user_name = 'root'
             user_monthly_cost = monthly_cost
             user_monthly_unit = monthly_unit
-        else:
-            # Assuming a tag `CreatedBy` (change as per your tagging system)
-            user_name = user_arn.split('/')[-1]
-            user_monthly_response = self.ce_client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': str(first_day_of_month),
-                    'End': str(today.date())
-                },
-                Filter={
-                    "And": [
-                        {
-                            'Dimensions': {
-                                'Key': 'SERVICE',
-                                'Values': ['Amazon Elastic Compute Cloud - Compute']
-                            }
-                        },
-                        {
-                            'Tags': {
-                                'Key': 'CreatedBy',
-                                'Values': [user_name]
-                            }
-                        }
-                    ]
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-            )
-            user_monthly_cost = float(
-                user_monthly_response['ResultsByTime'][0]['Total']['UnblendedCost']['Amount'])
-            user_monthly_unit = user_monthly_response['ResultsByTime'][0]['Total']['UnblendedCost']['Unit']
-
-        # Fetch cost of each EC2 instance type in the last 24 hours
-        daily_response = self.ce_client.get_cost_and_usage(
-            TimePeriod={
-                'Start': str(yesterday),
-                'End': str(today.date())
-            },
-            Filter={
-                'Dimensions': {
-                    'Key': 'SERVICE',
-                    'Values': ['Amazon Elastic Compute Cloud - Compute']
-                }
-            },
-            Granularity='DAILY',
-            GroupBy=[{'Type': 'DIMENSION', 'Key': 'INSTANCE_TYPE'}],
-            Metrics=['UnblendedCost'],
-        )
-        daily_costs_by_instance = {group['Keys'][0]: (float(group['Metrics']['UnblendedCost']['Amount']),
-                                                      group['Metrics']['UnblendedCost']['Unit']) for group in daily_response['ResultsByTime'][0]['Groups']}
-
-        # Fetch cost caused by the current user in the last 24 hours
-        if is_root:
             user_daily_cost = sum([cost[0]
                                   for cost in daily_costs_by_instance.values()])
             # Using monthly unit since it should be the same for daily
             user_daily_unit = monthly_unit
         else:
-            user_daily_response = self.ce_client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': str(yesterday),
-                    'End': str(today.date())
-                },
+            # Assuming a tag `CreatedBy` (change as per your tagging system)
+            user_name = identity['UserName']
+            user_results = results_by_time(
                 Filter={
                     "And": [
-                        {
-                            'Dimensions': {
-                                'Key': 'SERVICE',
-                                'Values': ['Amazon Elastic Compute Cloud - Compute']
-                            }
-                        },
+                        service_filter,
                         {
                             'Tags': {
                                 'Key': 'CreatedBy',
@@ -3214,16 +3756,26 @@ class AWSBoto:
                             }
                         }
                     ]
-                },
-                Granularity='DAILY',
-                Metrics=['UnblendedCost'],
-            )
+                })
+            user_monthly_cost = sum(float(result['Total']['UnblendedCost']['Amount'])
+                                    for result in user_results if in_month(result))
+            user_monthly_unit = user_results[-1]['Total']['UnblendedCost']['Unit'] \
+                if user_results else monthly_unit
             user_daily_cost = float(
-                user_daily_response['ResultsByTime'][0]['Total']['UnblendedCost']['Amount'])
-            user_daily_unit = user_daily_response['ResultsByTime'][0]['Total']['UnblendedCost']['Unit']
+                user_results[-1]['Total']['UnblendedCost']['Amount']) if user_results else 0.0
+            user_daily_unit = user_monthly_unit
 
-        return monthly_cost, monthly_unit, daily_costs_by_instance, user_monthly_cost, \
-            user_monthly_unit, user_daily_cost, user_daily_unit, user_name
+        costs = (monthly_cost, monthly_unit, daily_costs_by_instance, user_monthly_cost,
+                 user_monthly_unit, user_daily_cost, user_daily_unit, user_name)
+
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump({'key': cache_key, 'fetched_at': time.time(),
+                           'costs': costs}, f)
+        except OSError as e:
+            printdbg(f'Could not write cost cache {cache_file}: {e}')
+
+        return costs
 
 
 class Archiver:
@@ -3466,7 +4018,7 @@ class Archiver:
             shortlabel = os.path.basename(folders[0])
 
             # Add the original cmdline to the Slurm script
-            cmd = " ".join(map(shlex.quote, sys.argv))
+            cmd = shlex.join(sys.argv)
 
             # Submit the job
             return se.submit_job(cmd=cmd,
@@ -3846,12 +4398,11 @@ class Archiver:
     def _is_mounted(self, folder):
         '''Check if the given folder is already mounted'''
 
-        mounts = self.get_mounts()
-
-        if folder in mounts:
-            return True
-        else:
-            return False
+        try:
+            return get_mount_table().get(folder, '').startswith('fuse.rclone')
+        except Exception:
+            print_error()
+            sys.exit(1)
 
     def print_current_mounts(self):
         '''Print the current mounted folders'''
@@ -4083,13 +4634,23 @@ class Archiver:
     def _create_progress_bar(self, max_value):
         '''Create a progress bar'''
 
+        length = 50  # adjust as needed for the bar length
+        bar = "█" * length + '-' * length
+        step = max_value / 200
+        is_tty = sys.stdin.isatty()
+        last_printed = -max_value
+
         def show_progress_bar(iteration):
-            percent = ("{0:.1f}").format(100 * (iteration / float(max_value)))
-            length = 50  # adjust as needed for the bar length
+            nonlocal last_printed
+            # Rate-limit redraws to ~200 per bar
+            if iteration != max_value and iteration - last_printed < step:
+                return
+            last_printed = iteration
             filled_length = int(length * iteration // max_value)
-            bar = "█" * filled_length + '-' * (length - filled_length)
-            if sys.stdin.isatty():
-                log(f'\r|{bar}| {percent}%', end='\r')
+            if is_tty:
+                sys.stdout.write(
+                    f'\r|{bar[length - filled_length:2 * length - filled_length]}| {100 * iteration / max_value:.1f}%\r')
+                sys.stdout.flush()
             if iteration == max_value:
                 log()
 
@@ -4189,7 +4750,7 @@ class Archiver:
                 hashpath = os.path.join(root, hash_file)
 
                 # Set the number of workers
-                max_workers = max(4, int(self.args.cores))
+                max_workers = max(4, self.args.cores)
 
                 with open(hashpath, "w") as out_f:
                     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -4734,7 +5295,14 @@ class Archiver:
         '''Calculate md5sum of a file'''
 
         md5_hash = hashlib.md5()
-        with open(file_path, "rb") as f:
+        # Reading for a checksum should not update the access time, which
+        # froster uses to find old folders. O_NOATIME is only permitted to
+        # the file owner
+        try:
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_NOATIME', 0))
+        except PermissionError:
+            fd = os.open(file_path, os.O_RDONLY)
+        with open(fd, "rb") as f:
             for chunk in iter(lambda: f.read(4096), b""):
                 md5_hash.update(chunk)
         return md5_hash.hexdigest()
@@ -4904,8 +5472,8 @@ class Archiver:
         except Exception:
             print_error()
 
-    def archive_json_get_csv(self, columns):
-        '''Get the archive JSON data as a CSV string'''
+    def archive_json_get_rows(self, columns):
+        '''Get the archive JSON data as a list of rows, the first one being columns'''
         try:
             if not os.path.exists(self.archive_json):
                 return
@@ -4915,32 +5483,21 @@ class Archiver:
                     data = json.load(file)
 
                 except Exception:
-                    log('Error in Archiver._archive_json_get_csv():')
+                    log('Error in Archiver.archive_json_get_rows():')
                     log(
                         f'Cannot read {self.archive_json}, file corrupt?')
                     return
 
             # Sort data by timestamp in reverse order
             sorted_data = sorted(
-                data.items(), key=lambda x: x[1]['timestamp'], reverse=True)
-
-            # Prepare CSV data
-            csv_data = [columns]
-
-            for path_name, row_data in sorted_data:
-                csv_row = [row_data[col] for col in columns if col in row_data]
-                csv_data.append(csv_row)
+                data.values(), key=lambda x: x['timestamp'], reverse=True)
 
-            # Convert CSV data to a CSV string
-            output = io.StringIO()
+            rows = [columns]
+            for row_data in sorted_data:
+                rows.append([row_data[col]
+                            for col in columns if col in row_data])
 
-            writer = csv.writer(output, dialect='excel')
-            writer.writerows(csv_data)
-            csv_string = output.getvalue()
-
-            output.close()
-
-            return csv_string
+            return rows
 
         except Exception:
             print_error()
@@ -5176,10 +5733,11 @@ class TableHotspots(App[list]):
 
     def on_mount(self) -> None:
         table = self.query_one(DataTable)
-        fh = open(self.file, 'r')
-        rows = csv.reader(fh)
-        table.add_columns(*next(rows))
-        table.add_rows(itertools.islice(rows, MAXHOTSPOTS))
+        # Only the first MAXHOTSPOTS rows are read, the rest of the file is skipped
+        with open(self.file, 'r', newline='', buffering=1 << 20) as fh:
+            rows = csv.reader(fh)
+            table.add_columns(*next(rows))
+            table.add_rows(list(itertools.islice(rows, MAXHOTSPOTS)))
 
     def accept_answer(self, answer: str) -> None:
         # adds yesno answer as last element in list
@@ -5232,9 +5790,10 @@ class TableArchive(App[list]):
 
     BINDINGS = [("q", "request_quit", "Quit")]
 
-    def __init__(self, files: list[str]):
+    def __init__(self, rows: list):
+        '''rows is a list of rows, the first one holding the column names'''
         super().__init__()
-        self.files = files
+        self.rows = rows
 
     def compose(self) -> ComposeResult:
         table = DataTable()
@@ -5248,7 +5807,7 @@ class TableArchive(App[list]):
 
     def on_mount(self) -> None:
         table = self.query_one(DataTable)
-        rows = csv.reader(io.StringIO(self.files))
+        rows = iter(self.rows)
         table.add_columns(*next(rows))
         table.add_rows(itertools.islice(rows, MAXHOTSPOTS))
 
@@ -5316,15 +5875,16 @@ class TableNIHGrants(App[list]):
     def action_request_quit(self) -> None:
         self.app.exit([])
 
-    @work
+    @work(exclusive=True)
     async def load_data(self, searchstr):
         table = self.query_one(DataTable)
         table.clear(columns=True)
 
-        await asyncio.sleep(0.1)
-
+        # Query NIH RePORTER in a thread so the event loop keeps the
+        # loading indicator and input responsive
         rep = NIHReporter()
-        data = rep.search_full(searchstr)
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, rep.search_full, searchstr)
         if not data:
             return
         rows = iter(data)
@@ -5339,6 +5899,14 @@ class TableNIHGrants(App[list]):
 
 
 class Rclone:
+
+    # Options passed to every Rclone command, the JSON log is parsed by _parse_log
+    BASE_OPTS = ('--use-json-log',)
+
+    # Rclone environments already built in this process, an Rclone object is
+    # created for every archived or restored folder
+    _envrn_cache = {}
+
     def __init__(self, args: argparse.Namespace, cfg: ConfigManager):
         '''Initialize Rclone object'''
 
@@ -5350,29 +5918,51 @@ class Rclone:
             # Set the Rclone executable path
             self.rc = os.path.join(self.cfg.froster_dir, 'rclone')
 
-            # Set the Rclone environment variables
-            self.envrn = {}
-            self.envrn['RCLONE_S3_ENV_AUTH'] = 'true'
-            self.envrn['RCLONE_S3_PROVIDER'] = cfg.provider
-            self.envrn['RCLONE_S3_ENDPOINT'] = cfg.endpoint
-            self.envrn['RCLONE_S3_REGION'] = cfg.get_region(
+            # Set the Rclone environment variables. Callers modify envrn,
+            # so every object gets its own copy of the cached entry
+            self.envrn = dict(self._get_envrn(cfg))
+
+        except Exception:
+            print_error()
+            sys.exit(1)
+
+    @classmethod
+    def _get_envrn(cls, cfg):
+        '''Get the Rclone environment for the configured profile, reading
+        the AWS config and credentials files only when they change'''
+
+        def mtime(path):
+            try:
+                return os.stat(path).st_mtime_ns
+            except (OSError, TypeError):
+                return None
+
+        key = (cfg.provider, cfg.endpoint, cfg.profile, cfg.storage_class,
+               mtime(getattr(cfg, 'aws_config_file', None)),
+               mtime(getattr(cfg, 'aws_credentials_file', None)))
+
+        envrn = cls._envrn_cache.get(key)
+        if envrn is None:
+            envrn = {}
+            envrn['RCLONE_S3_ENV_AUTH'] = 'true'
+            envrn['RCLONE_S3_PROVIDER'] = cfg.provider
+            envrn['RCLONE_S3_ENDPOINT'] = cfg.endpoint
+            envrn['RCLONE_S3_REGION'] = cfg.get_region(
                 cfg.profile)
-            self.envrn['RCLONE_S3_STORAGE_CLASS'] = cfg.storage_class
+            envrn['RCLONE_S3_STORAGE_CLASS'] = cfg.storage_class
 
-            self.envrn['AWS_ACCESS_KEY_ID'] = cfg.get_credential(
+            envrn['AWS_ACCESS_KEY_ID'] = cfg.get_credential(
                 profile=cfg.profile, key_name='aws_access_key_id')
-            self.envrn['AWS_SECRET_ACCESS_KEY'] = cfg.get_credential(
+            envrn['AWS_SECRET_ACCESS_KEY'] = cfg.get_credential(
                 profile=cfg.profile, key_name='aws_secret_access_key')
 
-        except Exception:
-            print_error()
-            sys.exit(1)
+            cls._envrn_cache[key] = envrn
+
+        return envrn
 
     def _run_rclone_command(self, command, background=False):
         '''Run Rclone command'''
         try:
-            # Add options to Rclone command
-            command = self._add_opt(command, '--use-json-log')
             # Run the command
             if background:
 
@@ -5387,9 +5977,8 @@ class Rclone:
 
                 else:
                     # DO not print output
-                    with open(os.devnull, 'w') as devnull:
-                        ret = subprocess.Popen(
-                            command, stdout=devnull, stderr=devnull, text=True, env=self.envrn)
+                    ret = subprocess.Popen(
+                        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True, env=self.envrn)
 
                 # If we have a pid we assume the command was successful
                 if ret.pid:
@@ -5398,8 +5987,22 @@ class Rclone:
                     return False
 
             else:
-                ret = subprocess.run(
-                    command, capture_output=True, text=True, env=self.envrn)
+                # Stream the JSON log from stderr instead of buffering it,
+                # only the latest stats entry is needed
+                ret = subprocess.Popen(
+                    command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, bufsize=1, env=self.envrn)
+
+                last_stats_line = None
+                err_lines = []
+                if self.cfg.provider == 'Minio':
+                    err_lines = ret.stderr.readlines()
+                else:
+                    # Keep the raw line, it is only decoded if rclone fails
+                    for line in ret.stderr:
+                        if 'accounting/stats' in line:
+                            last_stats_line = line
+                ret.stderr.close()
+                ret.wait()
 
                 # Check if the command was successful
                 if ret.returncode == 0:
@@ -5431,14 +6034,12 @@ class Rclone:
 
                     # TODO: Review if this is really necessary for Minio
                     if self.cfg.provider == 'Minio':
-                        out, err = ret.stdout.strip(), ret.stderr.strip()
-                        log(err)
-                    else:
-                        out, err = ret.stdout.strip(), ret.stderr.strip()
-                        stats, ops = self._parse_log(err)
-                        ret = stats[-1]  # return the stats
-                        log(
-                            f"        Error message: {ret['stats']['lastError']}\n", file=sys.stderr)
+                        log(''.join(err_lines).strip())
+                    elif last_stats_line:
+                        for source, obj in self._parse_log([last_stats_line]):
+                            if source == 'stats':
+                                log(
+                                    f"        Error message: {obj['stats']['lastError']}\n", file=sys.stderr)
 
                     return False
 
@@ -5449,7 +6050,7 @@ class Rclone:
         '''Copy files from source to destination using Rclone'''
         try:
             # Build the copy command
-            command = [self.rc, 'copy'] + list(args)
+            command = [self.rc, 'copy', *self.BASE_OPTS, *args]
             command.append(src)
             command.append(dst)
             command.append('-vvv')
@@ -5463,7 +6064,7 @@ class Rclone:
     def checksum(self, md5file, dst, *args):
         '''Check the checksum of a file using Rclone'''
         try:
-            command = [self.rc, 'checksum'] + list(args)
+            command = [self.rc, 'checksum', *self.BASE_OPTS, *args]
             command.append('md5')
             command.append(md5file)
             command.append(dst)
@@ -5484,7 +6085,7 @@ class Rclone:
 
         try:
             # Build the copy command
-            command = [self.rc, 'mount'] + list(args)
+            command = [self.rc, 'mount', *self.BASE_OPTS, *args]
             command.append('--allow-non-empty')
             command.append('--default-permissions')
             command.append('--read-only')
@@ -5493,6 +6094,7 @@ class Rclone:
             command.append(dst)
 
             # Run the copy command and return if it was successful
+            clear_mount_table_cache()
             return self._run_rclone_command(command, background=True)
 
         except Exception:
@@ -5512,6 +6114,7 @@ class Rclone:
             cmd = ['fusermount3', '-u', mountpoint]
             ret = subprocess.run(cmd, capture_output=False,
                                  text=True, env=self.envrn)
+            clear_mount_table_cache()
 
             if ret.returncode == 0:
                 return True
@@ -5525,7 +6128,7 @@ class Rclone:
     def version(self):
         '''Get the Rclone version'''
         try:
-            command = [self.rc, 'version']
+            command = [self.rc, 'version', *self.BASE_OPTS]
             return self._run_rclone_command(command)
         except Exception:
             print_error()
@@ -5534,14 +6137,8 @@ class Rclone:
     def get_mounts(self):
         '''Get the mounted Rclone mounts'''
         try:
-            mounts = []
-            with open('/proc/mounts', 'r') as f:
-                for line in f:
-                    parts = line.split()
-                    mount_point, fs_type = parts[1], parts[2]
-                    if fs_type.startswith('fuse.rclone'):
-                        mounts.append(mount_point)
-            return mounts
+            return [mount_point for mount_point, fs_type in get_mount_table().items()
+                    if fs_type.startswith('fuse.rclone')]
         except Exception:
             print_error()
             return []
@@ -5567,42 +6164,49 @@ class Rclone:
             print_error()
             return []
 
-    def _add_opt(self, cmd, option, value=None):
-        '''Add an option to the command if it is not already present'''
-        try:
-            if option not in cmd:
-                cmd.append(option)
-                if value:
-                    cmd.append(value)
+    def _parse_log(self, lines):
+        '''Parse the Rclone JSON log line by line.
+        Yields ('stats', obj) and ('operations', obj) tuples. Malformed lines
+        are skipped, the lines may come from a pipe rclone is still writing
+        to and must be read to the end'''
+        for line in lines:
+            if not line or line[0] != "{":
+                continue
+            # Only decode the lines that can be stats or operations entries,
+            # with -vvv most of the log is other debug output
+            if 'accounting/stats' not in line and 'operations/operations' not in line:
+                continue
+            try:
+                obj = json.loads(line.rstrip())
+                source = obj.get('source', '')
+            except (ValueError, AttributeError):
+                printdbg(f'Skipping malformed rclone log line: {line.rstrip()}')
+                continue
+            if 'accounting/stats' in source:
+                yield 'stats', obj
+            elif 'operations/operations' in source:
+                yield 'operations', obj
 
-            return cmd
 
-        except Exception:
-            print_error()
-            return cmd
-
-    def _parse_log(self, strstderr):
-        '''Parse the Rclone log'''
-        try:
-            lines = strstderr.split('\n')
-            data = [json.loads(line.rstrip())
-                    for line in lines if line[0] == "{"]
-            stats = []
-            operations = []
-            for obj in data:
-                if 'accounting/stats' in obj['source']:
-                    stats.append(obj)
-                elif 'operations/operations' in obj['source']:
-                    operations.append(obj)
-            return stats, operations
+class Slurm:
+    '''Class to handle Slurm essentials'''
 
-        except Exception:
-            print_error()
-            return [], []
+    # squeue format codes and the column names squeue prints for them
+    SQUEUE_FIELDS = (('%i', 'JOBID'), ('%j', 'NAME'), ('%t', 'ST'),
+                     ('%M', 'TIME'), ('%L', 'TIME_LEFT'), ('%D', 'NODES'),
+                     ('%C', 'CPUS'), ('%m', 'MIN_MEMORY'),
+                     ('%b', 'TRES_PER_NODE'), ('%R', 'NODELIST(REASON)'))
+    SQUEUE_HEADERS = tuple(header for _, header in SQUEUE_FIELDS)
+    SQUEUE_OUTPUT_FORMAT = ','.join(f'"{code}"' for code, _ in SQUEUE_FIELDS)
 
+    # Seconds the parsed 'scontrol show partition' output is reused, the
+    # partitions rarely change during one froster run
+    PARTITIONS_TTL = 60
+    _partitions_cache = None
+    _partitions_cache_ts = float('-inf')
 
-class Slurm:
-    '''Class to handle Slurm essentials'''
+    # Group names of the current user, group lookups may go to LDAP
+    _user_groups_cache = None
 
     def __init__(self, args, cfg: ConfigManager):
         '''Initialize Slurm object'''
@@ -5611,10 +6215,12 @@ class Slurm:
             # Create the slurm directory if it does not exist
             os.makedirs(cfg.slurm_dir, exist_ok=True, mode=0o775)
 
-            self.script_lines = ["#!/bin/bash"]
+            # #SBATCH directives must precede the commands, keep them apart
+            self._sbatch_lines = []
+            self._body_lines = []
             self.cfg = cfg
             self.args = args
-            self.squeue_output_format = '"%i","%j","%t","%M","%L","%D","%C","%m","%b","%R"'
+            self.squeue_output_format = self.SQUEUE_OUTPUT_FORMAT
             self.jobs = []
             self.job_info = {}
 
@@ -5673,7 +6279,11 @@ class Slurm:
         '''Add a line to the Slurm script'''
         try:
             if line:
-                self.script_lines.append(line)
+                for script_line in line.splitlines():
+                    if script_line.startswith('#SBATCH'):
+                        self._sbatch_lines.append(script_line)
+                    else:
+                        self._body_lines.append(script_line)
         except Exception:
             print_error()
 
@@ -5728,32 +6338,27 @@ class Slurm:
         except Exception:
             print_error()
 
-    def _reorder_sbatch_lines(self, script_buffer):
-        '''Reorder the Slurm script lines to have all #SBATCH lines at the top.'''
-
-        try:
-            # we need to make sure that all #BATCH are at the top
-            script_buffer.seek(0)
-            lines = script_buffer.readlines()
-            # Remove the shebang line from the list of lines
-            shebang_line = lines.pop(0)
-            sbatch_lines = [
-                line for line in lines if line.startswith("#SBATCH")]
-            non_sbatch_lines = [
-                line for line in lines if not line.startswith("#SBATCH")]
-            reordered_script = io.StringIO()
-            reordered_script.write(shebang_line)
-            for line in sbatch_lines:
-                reordered_script.write(line)
-            for line in non_sbatch_lines:
-                reordered_script.write(line)
-            # add a local scratch teardown, if configured
-            reordered_script.write(self.cfg.lscratch_rmdir)
-            reordered_script.seek(0)
-            return reordered_script
-
-        except Exception:
-            print_error()
+    def _build_sbatch_header(self, cmd_type, shortlabel, output_dir, scheduled=None):
+        '''Get the #SBATCH directives of a froster job'''
+
+        header = [
+            f'#SBATCH --job-name=froster:{cmd_type}:{shortlabel}',
+            f'#SBATCH --cpus-per-task={self.args.cores}',
+            f'#SBATCH --mem={self.args.memory}',
+            '#SBATCH --requeue',
+            f'#SBATCH --output={output_dir}-%J.out',
+            '#SBATCH --mail-type=FAIL,REQUEUE,END',
+            f'#SBATCH --mail-user={self.cfg.email}',
+            f'#SBATCH --time={self.walltime}',
+        ]
+        if scheduled:
+            header.insert(3, f'#SBATCH --begin={scheduled}')
+        # Let Slurm use its defaults when no partition or QOS is configured
+        if self.partition:
+            header.append(f'#SBATCH --partition={self.partition}')
+        if self.qos:
+            header.append(f'#SBATCH --qos={self.qos}')
+        return header
 
     def submit_job(self, cmd, cmd_type, label, shortlabel, scheduled=None):
         '''Submit a Slurm job'''
@@ -5764,19 +6369,8 @@ class Slurm:
                 self.cfg.slurm_dir, f'froster-{cmd_type}@{label}')
 
             # Compile the Slurm script
-            self.add_line(
-                f'#SBATCH --job-name=froster:{cmd_type}:{shortlabel}')
-            self.add_line(f'#SBATCH --cpus-per-task={self.args.cores}')
-            self.add_line(f'#SBATCH --mem={self.args.memory}')
-            if scheduled:
-                self.add_line(f'#SBATCH --begin={scheduled}')
-            self.add_line(f'#SBATCH --requeue')
-            self.add_line(f'#SBATCH --output={output_dir}-%J.out')
-            self.add_line(f'#SBATCH --mail-type=FAIL,REQUEUE,END')
-            self.add_line(f'#SBATCH --mail-user={self.cfg.email}')
-            self.add_line(f'#SBATCH --time={self.walltime}')
-            self.add_line(f'#SBATCH --partition={self.partition}')
-            self.add_line(f'#SBATCH --qos={self.qos}')
+            self._sbatch_lines += self._build_sbatch_header(
+                cmd_type, shortlabel, output_dir, scheduled)
 
             # Add the command line to the Slurm script
             self.add_line(cmd)
@@ -5802,33 +6396,32 @@ class Slurm:
         '''Submit the Slurm script'''
 
         try:
-            script = io.StringIO()
-            for line in self.script_lines:
-                script.write(line + "\n")
-            script.seek(0)
-            oscript = self._reorder_sbatch_lines(script)
-            script = oscript.read()
+            # Shebang, #SBATCH directives, commands and the local scratch
+            # teardown, if configured
+            script = '\n'.join(['#!/bin/bash', *self._sbatch_lines,
+                                *self._body_lines, '']) + self.cfg.lscratch_rmdir
 
             # Print the script to be submitted
             printdbg(script)
 
-            result = subprocess.run(["sbatch"], text=True, shell=True, input=script,
+            # Run sbatch directly (no shell) and feed the script through stdin
+            proc = subprocess.Popen(["sbatch"], text=True, stdin=subprocess.PIPE,
                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if result.returncode != 0:
-                if 'Invalid generic resource' in result.stderr:
+            stdout, stderr = proc.communicate(input=script)
+            if proc.returncode != 0:
+                if 'Invalid generic resource' in stderr:
                     log(
                         'Invalid generic resource request. Please change configuration of slurm_lscratch')
                 else:
                     raise RuntimeError(
-                        f"Error running sbatch: {result.stderr.strip()}")
+                        f"Error running sbatch: {stderr.strip()}")
                 sys.exit(1)
 
-            job_id = int(result.stdout.split()[-1])
+            job_id = int(stdout.split()[-1])
 
             if self.args.debug:
-                oscript.seek(0)
                 with open(f'submitted-{job_id}.sh', "w", encoding="utf-8") as file:
-                    file.write(oscript.read())
+                    file.write(script)
                     log(f' Debug script created: submitted-{job_id}.sh')
             return job_id
 
@@ -5839,7 +6432,7 @@ class Slurm:
     def squeue(self):
         '''Get the Slurm jobs'''
         try:
-            result = subprocess.run(["squeue", "--me", "-o", self.squeue_output_format],
+            result = subprocess.run(["squeue", "--me", "--noheader", "-o", self.squeue_output_format],
                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
             if result.returncode != 0:
                 raise RuntimeError(
@@ -5850,11 +6443,17 @@ class Slurm:
             print_error()
 
     def _parse_squeue_output(self, output):
-        try:
-            csv_file = io.StringIO(output)
-            reader = csv.DictReader(csv_file, delimiter=',',
-                                    quotechar='"', skipinitialspace=True)
-            jobs = [row for row in reader]
+        '''Parse headerless squeue output produced with SQUEUE_OUTPUT_FORMAT'''
+        try:
+            # The format is fixed and fully quoted, so every line is
+            # "v1","v2",...; strip the outer quotes and split on '","'
+            headers = self.SQUEUE_HEADERS
+            jobs = []
+            for line in output.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                jobs.append(dict(zip(headers, line[1:-1].split('","'))))
             return jobs
         except Exception:
             print_error()
@@ -5865,12 +6464,11 @@ class Slurm:
 
         try:
             lines = data_str.strip().splitlines()
+            if not lines:
+                return []
             headers = lines[0].split(separator)
-            data = []
-            for line in lines[1:]:
-                values = line.split(separator)
-                data.append(dict(zip(headers, values)))
-            return data
+            return [dict(zip(headers, line.split(separator)))
+                    for line in lines[1:]]
 
         except Exception:
             print_error()
@@ -5880,17 +6478,9 @@ class Slurm:
         """Parse data presented in a tabular format into a list of dictionaries."""
 
         try:
-            lines = data_str.strip().split('\n')
-            # Parse each line into a dictionary
-            partitions = []
-            for line in lines:
-                parts = line.split()
-                partition_dict = {}
-                for part in parts:
-                    key, value = part.split("=", 1)
-                    partition_dict[key] = value
-                partitions.append(partition_dict)
-            return partitions
+            # Parse each line into a dictionary with a single regex scan
+            return [dict(SLURM_KEY_VALUE_RE.findall(line))
+                    for line in data_str.splitlines() if line.strip()]
 
         except Exception:
             print_error()
@@ -5898,20 +6488,23 @@ class Slurm:
     def _get_user_groups(self):
         """Get the groups the current Unix user is a member of."""
         try:
-            groups = [grp.getgrgid(gid).gr_name for gid in os.getgroups()]
-            return groups
+            # Group membership does not change during a run, resolve it once
+            if Slurm._user_groups_cache is None:
+                Slurm._user_groups_cache = [
+                    grp.getgrgid(gid).gr_name for gid in os.getgroups()]
+            return list(Slurm._user_groups_cache)
         except Exception:
             print_error()
             return []
 
     def _get_output(self, command):
-        """Execute a shell command and return its output."""
+        """Execute a command given as an argument list and return its output."""
         try:
-            result = subprocess.run(command, shell=True, text=True,
+            result = subprocess.run(command, text=True,
                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             if result.returncode != 0:
                 raise RuntimeError(
-                    f"Error running {command}: {result.stderr.strip()}")
+                    f"Error running {shlex.join(command)}: {result.stderr.strip()}")
             return result.stdout.strip()
         except Exception:
             print_error()
@@ -5919,13 +6512,14 @@ class Slurm:
 
     def _get_default_account(self):
         """Get the default account for the current user."""
-        return self._get_output(f'sacctmgr --noheader --parsable2 show user {self.cfg.whoami} format=DefaultAccount')
+        return self._get_output(['sacctmgr', '--noheader', '--parsable2', 'show', 'user',
+                                 self.cfg.whoami, 'format=DefaultAccount'])
 
     def _get_associations(self):
         """Get the associations between accounts and QOSs."""
         try:
-            mystr = self._get_output(
-                f"sacctmgr show associations where user={self.cfg.whoami} format=Account,QOS --parsable2")
+            mystr = self._get_output(['sacctmgr', 'show', 'associations', 'where',
+                                      f'user={self.cfg.whoami}', 'format=Account,QOS', '--parsable2'])
             asso = {item['Account']: item['QOS'].split(
                 ",") for item in self._parse_tabular_data(mystr) if 'Account' in item}
             return asso
@@ -5934,6 +6528,34 @@ class Slurm:
             print_error()
             return {}
 
+    def _prefetch_slurm_state(self, account=None):
+        """Query the partitions, the associations and, if no account is
+        given, the default account concurrently and keep the results in
+        self._partitions, self._associations and self._default_account."""
+
+        cls = type(self)
+        partitions_cached = time.monotonic() - \
+            cls._partitions_cache_ts < self.PARTITIONS_TTL
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            partition_task = executor.submit(
+                self._get_output, ['scontrol', 'show', 'partition', '--oneliner']) if not partitions_cached else None
+            associations_task = executor.submit(self._get_associations)
+            account_task = executor.submit(
+                self._get_default_account) if account is None else None
+
+            if partition_task:
+                partitions = self._parse_partition_data(
+                    partition_task.result())
+                if partitions:
+                    cls._partitions_cache = partitions
+                    cls._partitions_cache_ts = time.monotonic()
+                self._partitions = partitions
+            else:
+                self._partitions = cls._partitions_cache
+            self._associations = associations_task.result()
+            self._default_account = account_task.result() if account_task else account
+
     def get_allowed_partitions_and_qos(self):
         """Get a dictionary with keys = partitions and values = QOSs the user is allowed to use."""
 
@@ -5943,42 +6565,53 @@ class Slurm:
             sacc = os.environ.get('SLURM_ACCOUNT', '')
             account = sacc if sacc else account
             allowed_partitions = {}
-            partition_str = self._get_output(
-                "scontrol show partition --oneliner")
-            partitions = self._parse_partition_data(partition_str)
-            user_groups = self._get_user_groups()
-            if account is None:
-                account = self._get_default_account()
+            # The Slurm queries are independent, run them all at once
+            self._prefetch_slurm_state(account)
+            partitions = self._partitions
+            associations = self._associations
+            account = self._default_account
+            # QOSs of the account, the same for every partition
+            account_qos = associations.get(account, [])
+            user_groups = frozenset(self._get_user_groups())
             for partition in partitions:
                 pname = partition['PartitionName']
                 add_partition = False
                 if partition.get('State', '') != 'UP':
                     continue
-                if any(group in user_groups for group in partition.get('DenyGroups', '').split(',')):
+                # Split each comma separated field once per partition
+                deny_groups = partition.get('DenyGroups', '')
+                deny_accounts = set(
+                    partition.get('DenyAccounts', '').split(','))
+                allow_accounts = set(
+                    partition.get('AllowAccounts', '').split(','))
+                allow_groups = partition.get('AllowGroups', '')
+                # Group lists are often unset, only split them when present
+                if deny_groups and not user_groups.isdisjoint(deny_groups.split(',')):
                     continue
-                if account in partition.get('DenyAccounts', '').split(','):
+                if account in deny_accounts:
                     continue
-                allowedaccounts = partition.get('AllowAccounts', '').split(',')
-                if allowedaccounts != ['']:
-                    if account in allowedaccounts or 'ALL' in allowedaccounts:
+                if allow_accounts != {''}:
+                    if account in allow_accounts or 'ALL' in allow_accounts:
                         add_partition = True
-                elif any(group in user_groups for group in partition.get('AllowGroups', '').split(',')):
+                elif allow_groups and not user_groups.isdisjoint(allow_groups.split(',')):
                     add_partition = True
-                elif partition.get('AllowGroups', '') == 'ALL':
+                elif allow_groups == 'ALL':
                     add_partition = True
-                if add_partition:
-                    p_deniedqos = partition.get('DenyQos', '').split(',')
-                    p_allowedqos = partition.get('AllowQos', '').split(',')
-                    associations = self._get_associations()
-                    account_qos = associations.get(account, [])
-                    if p_deniedqos != ['']:
+                if add_partition and not account_qos:
+                    # Nothing to filter, skip parsing the partition QOS fields
+                    allowed_partitions[pname] = []
+                elif add_partition:
+                    p_deniedqos = set(partition.get('DenyQos', '').split(','))
+                    p_allowedqos = set(
+                        partition.get('AllowQos', '').split(','))
+                    if p_deniedqos != {''}:
                         allowed_qos = [
                             q for q in account_qos if q not in p_deniedqos]
                         # log(f"p_deniedqos: allowed_qos in {pname}:", allowed_qos)
-                    elif p_allowedqos == ['ALL']:
+                    elif p_allowedqos == {'ALL'}:
                         allowed_qos = account_qos
                         # log(f"p_allowedqos = ALL in {pname}:", allowed_qos)
-                    elif p_allowedqos != ['']:
+                    elif p_allowedqos != {''}:
                         allowed_qos = [
                             q for q in account_qos if q in p_allowedqos]
                         # log(f"p_allowedqos: allowed_qos in {pname}:", allowed_qos)
@@ -5998,6 +6631,9 @@ class NIHReporter:
     # if we use --nih as an argument we query NIH Reporter
     # for metadata
 
+    # Characters replaced with a space in search strings
+    CLEAN_TABLE = str.maketrans(dict.fromkeys(",:?'$^%&*!`~+={}\\[]\"", ' '))
+
     def __init__(self, verbose=False, active=False, years=None):
         '''Initialize NIHReporter object'''
         self.verbose = verbose
@@ -6006,16 +6642,35 @@ class NIHReporter:
         self.url = 'https://api.reporter.nih.gov/v2/projects/search'
         self.exclude_fields = ['Terms', 'AbstractText',
                                'PhrText']  # pref_terms still included
-        self.grants = []
+        # Grants by core project number, the first one found is kept
+        self.grants = {}
+
+        # One pooled HTTPS session for all the pages, retrying failed
+        # connections and server errors with a backoff
+        # (POST is not retried by default, None allows every method)
+        retry_opts = dict(total=5, backoff_factor=1,
+                          status_forcelist=(429, 500, 502, 503, 504),
+                          raise_on_status=False)
+        try:
+            retries = requests.adapters.Retry(
+                allowed_methods=None, **retry_opts)
+        except TypeError:
+            # urllib3 < 1.26 names the option method_whitelist
+            retries = requests.adapters.Retry(
+                method_whitelist=None, **retry_opts)
+        self._session = requests.Session()
+        self._session.mount('https://', requests.adapters.HTTPAdapter(
+            pool_connections=8, pool_maxsize=8, max_retries=retries))
 
     def search_full(self, searchstr):
         '''Search NIH Reporter for metadata using a search string'''
         searchstr = self._clean_string(searchstr)
         if not searchstr:
             return []
+        is_number = self._is_number(searchstr)
 
         # Search by PI
-        if not self._is_number(searchstr):
+        if not is_number:
 
             log('PI search ...')
             criteria = {"pi_names": [{"any_name": searchstr}]}
@@ -6029,7 +6684,7 @@ class NIHReporter:
             self._post_request(criteria)
             log('* # Grants:', len(self.grants))
 
-        if not self.grants and not self._is_number(searchstr):
+        if not self.grants and not is_number:
             # Search by Organizations
             log('Org search ...')
             criteria = {'org_names': [searchstr]}
@@ -6067,80 +6722,85 @@ class NIHReporter:
 
     def _clean_string(self, mystring):
         '''Clean a string'''
-
-        mychars = ",:?'$^%&*!`~+={}\\[]"+'"'
-        for i in mychars:
-            mystring = mystring.replace(i, ' ')
-            # log('mystring:', mystring)
-        return mystring
+        return mystring.translate(self.CLEAN_TABLE)
 
     def _post_request(self, criteria):
-        '''Make a POST request to NIH Reporter'''
+        '''Make POST requests to NIH Reporter, fetching all the pages of results'''
 
-        # make request with retries
-        offset = 0
-        timeout = 30
         limit = 250
-        max = 250
-        max_retries = 5
-        retry_delay = 1
-        retry_count = 0
-        total = max
-        # for retry_count in range(max_retries):
-        try:
-            while offset < max:
-                params = {'offset': offset, 'limit': limit, 'criteria': criteria,
-                          'exclude_fields': self.exclude_fields}
-                # make request
-                log('Params:', params)
-                response = requests.post(
-                    self.url, json=params, timeout=timeout)
-                # check status code - else return data
-                if response.status_code >= 400 and response.status_code < 500:
-                    log(f"Bad request: {response.text}")
-                    if retry_count < max_retries - 1:
-                        log(f"Retrying after {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_count += 1
-                    else:
-                        # raise Exception(f"Failed to complete POST request after {max_retries} attempts")
-                        log(
-                            f"Failed to complete POST request after {max_retries} attempts")
-                        return False
-                else:
-                    json = response.json()
-                    total = json['meta']['total']
-                    if total == 0:
-                        if self.verbose:
-                            log(
-                                "No records for criteria '{}'".format(criteria))
-                        return
-                    if total < max:
-                        max = total
-                    if self.verbose:
-                        log("Found {0} records for criteria '{1}'".format(
-                            total, criteria))
-                    self.grants += [g for g in json['results']]
+        # NIH Reporter does not serve offsets past 14999
+        page_cap = 15000
+        try:
+            # Only the offset changes from page to page
+            base_params = {'limit': limit, 'criteria': criteria,
+                           'exclude_fields': self.exclude_fields}
+
+            # The first page tells how many records there are
+            payload = self._post_page({**base_params, 'offset': 0})
+            if payload is None:
+                return False
+            total = payload['meta']['total']
+            if total == 0:
+                if self.verbose:
+                    log(
+                        "No records for criteria '{}'".format(criteria))
+                return
+            if self.verbose:
+                log("Found {0} records for criteria '{1}'".format(
+                    total, criteria))
+            if total > page_cap:
+                log(f'Only the first {page_cap} of {total} records can be retrieved')
+                total = page_cap
+            self._add_grants(payload['results'])
+
+            # Fetch the remaining pages concurrently, keeping their order
+            offsets = range(limit, total, limit)
+            if not offsets:
+                return
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                pages = executor.map(self._post_page, [
+                    {**base_params, 'offset': offset} for offset in offsets])
+                failed = False
+                for offset, payload in zip(offsets, pages):
+                    # The session already retried this page, keep the
+                    # pages that did arrive
+                    if payload is None:
+                        failed = True
+                        continue
+                    self._add_grants(payload['results'])
                     if self.verbose:
                         log("{0} records off {1} total returned ...".format(
                             offset, total), file=sys.stderr)
-                    offset += limit
-                    if offset == 15000:
-                        offset == 14999
-                    elif offset > 15000:
-                        return
-        except requests.exceptions.RequestException as e:
-            log(f"POST request failed: {e}")
-            if retry_count < max_retries - 1:
-                log(f"Retrying after {retry_delay} seconds...")
-                retry_count += 1
-                time.sleep(retry_delay)
-            else:
-                return
+            return not failed
         except Exception:
             print_error()
             return
 
+    def _add_grants(self, results):
+        '''Add the grants of a page of results, skipping duplicate projects'''
+        for g in results:
+            core_project_num = str(g.get('core_project_num', '')).strip()
+            self.grants.setdefault(core_project_num, g)
+
+    def _post_page(self, params, timeout=30):
+        '''Make a POST request to NIH Reporter for one page of results.
+        Returns the decoded response or None if the request failed'''
+
+        try:
+            # make request, retries are handled by the session
+            log('Params:', params)
+            response = self._session.post(
+                self.url, json=params, timeout=timeout)
+            # check status code - else return data
+            if response.status_code >= 400:
+                log(f"Bad request: {response.text}")
+                return None
+            # Decode the UTF-8 body directly, without building the text first
+            return json.loads(response.content)
+        except requests.exceptions.RequestException as e:
+            log(f"POST request failed: {e}")
+            return None
+
     def _result_sets(self, header=False):
         '''Get the result sets'''
 
@@ -6149,32 +6809,23 @@ class NIHReporter:
             if header:
                 sets.append(('project_num', 'start', 'end', 'contact_pi_name', 'project_title',
                             'org_name', 'project_detail_url', 'pi_profile_id'))
-            grants = {}
-            for g in self.grants:
+            for core_project_num, g in self.grants.items():
                 # log(json.dumps(g, indent=2))
                 # return
-                core_project_num = str(g.get('core_project_num', '')).strip()
+                # Values decoded from JSON are already str (or None)
                 line = (
                     core_project_num,
-                    str(g.get('project_start_date', '')).strip()[:10],
-                    str(g.get('project_end_date', '')).strip()[:10],
-                    str(g.get('contact_pi_name', '')).strip(),
-                    str(g.get('project_title', '')).strip()  # [:50]
-                )
-                org = ""
-                if g['organization']['org_name']:
-                    org = g['organization']['org_name']
-                line += (
-                    str(org.encode('utf-8'), 'utf-8'),
+                    (g.get('project_start_date') or '').strip()[:10],
+                    (g.get('project_end_date') or '').strip()[:10],
+                    (g.get('contact_pi_name') or '').strip(),
+                    (g.get('project_title') or '').strip(),  # [:50]
+                    (g.get('organization') or {}).get('org_name') or '',
                     g.get('project_detail_url', '')
                 )
                 for p in g['principal_investigators']:
                     if p.get('is_contact_pi', False):
                         line += (str(p.get('profile_id', '')),)
-                if not core_project_num in grants:
-                    grants[core_project_num] = line
-            for g in grants.values():
-                sets.append(g)
+                sets.append(line)
             return sets
 
         except Exception:
@@ -6182,6 +6833,142 @@ class NIHReporter:
             return []
 
 
+class FrosterHelpFormatter(argparse.RawTextHelpFormatter):
+    '''RawTextHelpFormatter looking up the terminal width once per process
+    instead of for every formatter argparse creates'''
+
+    _width = None
+
+    def __init__(self, prog, indent_increment=2, max_help_position=24, width=None):
+        if width is None:
+            if FrosterHelpFormatter._width is None:
+                FrosterHelpFormatter._width = shutil.get_terminal_size().columns - 2
+            width = FrosterHelpFormatter._width
+        super().__init__(prog, indent_increment, max_help_position, width)
+
+
+# Formatter of the sub-command help, argparse only instantiates it when
+# help or usage is printed
+HELP_FORMATTER = FrosterHelpFormatter
+
+# Help texts of the sub-commands and their long options
+HELP_CREDENTIALS = '''
+Check the current credentials for the selected provider are valid.
+'''
+
+HELP_CONFIG = '''
+Bootstrap the configurtion, install dependencies and setup your environment.
+You will need to answer a few questions about your cloud and hpc setup.
+'''
+
+HELP_INDEX = '''
+Scan a file system folder tree using 'pwalk' and generate a hotspots CSV file
+that lists the largest folders. As this process is compute intensive the
+index job will be automatically submitted to Slurm if the Slurm tools are
+found.
+'''
+
+HELP_ARCHIVE = '''
+Select from a list of large folders, that has been created by 'froster index', and
+archive a folder to S3/Glacier. Once you select a folder the archive job will be
+automatically submitted to Slurm. You can also automate this process
+
+'''
+
+HELP_DELETE = '''
+Remove data from a local filesystem folder that has been confirmed to
+be archived (through checksum verification). Use this instead of deleting manually
+'''
+
+HELP_MOUNT = '''
+Mount or unmount the remote S3 or Glacier storage in your local file system
+at the location of the original folder.
+'''
+
+HELP_RESTORE = '''
+Restore data from AWS Glacier to AWS S3 One Zone-IA. You do not need
+to download all data to local storage after the restore is complete.
+Just use the mount sub command.
+'''
+
+HELP_UPDATE = '''
+Update froster to the latest version
+'''
+
+HELP_ARCHIVE_LARGER = '''
+Archive folders larger than <GiB>. This option
+works in conjunction with --older <days>. If both
+options are set froster will print a command that
+allows you to archive all matching folders at once.
+'''
+
+HELP_ARCHIVE_OLDER = '''
+Archive folders that have not been accessed more than
+<days>. (optionally set --mtime to select folders that
+have not been modified more than <days>). This option
+works in conjunction with --larger <GiB>. If both
+options are set froster will print a command that
+allows you to archive all matching folders at once.
+'''
+
+HELP_ARCHIVE_NEWER = '''
+Archive folders that have been accessed within the last
+<days>. (optionally set --mtime to select folders that
+have not been modified more than <days>). This option
+works in conjunction with --larger <GiB>. If both
+options are set froster will print a command that
+allows you to archive all matching folders at once.
+'''
+
+HELP_ARCHIVE_RESET = '''
+This will not download any data, but recusively reset a folder
+from previous (e.g. failed) archiving attempt.
+It will delete .froster.md5sum and extract Froster.smallfiles.tar
+'''
+
+HELP_RESTORE_RETRIEVEOPT = '''
+More information at:
+    https://docs.aws.amazon.com/AmazonS3/latest/userguide/restoring-objects-retrieval-options.html
+    https://aws.amazon.com/es/s3/pricing/
+
+S3 GLACIER DEEP ARCHIVE or S3 INTELLIGET-TIERING DEEP ARCHIVE ACCESS
+    Bulk:
+        - Within 48 hours retrieval            <-- default
+        - costs of $2.50 per TiB
+    Standard:
+        - Within 12 hours retrieval
+        - costs of $10 per TiB
+    Expedited:
+        - 9-12 hours retrieval
+        - costs of $30 per TiB
+
+S3 GLACIER FLEXIBLE RETRIEVAL or S3 INTELLIGET-TIERING ARCHIVE ACCESS
+    Bulk:
+        - 5-12 hours retrieval
+        - costs of $2.50 per TiB
+    Standard:
+        - 3-5 hours retrieval
+        - costs of $10 per TiB
+    Expedited:
+        - 1-5 minutes retrieval
+        - costs of $30 per TiB
+
+
+    In addition to the retrieval cost, AWS will charge you about
+    $10/TiB/month for the duration you keep the data in S3.
+    (Costs in Summer 2023)
+'''
+
+
+class FrosterArgumentParser(argparse.ArgumentParser):
+    '''ArgumentParser reading @file arguments one per line, so paths with
+    spaces need no quoting'''
+
+    def convert_arg_line_to_args(self, arg_line):
+        # Skip blank lines, keep everything else verbatim
+        return [arg_line] if arg_line.strip() else []
+
+
 class Commands:
 
     def __init__(self):
@@ -6202,7 +6989,7 @@ class Commands:
     def print_version(self):
         '''Print froster version'''
 
-        log(f'froster v{pkg_resources.get_distribution("froster").version}')
+        log(f'froster v{get_froster_version()}')
 
     def print_info(self, cfg: ConfigManager):
         '''Print froster info'''
@@ -6216,7 +7003,7 @@ class Commands:
 
         log(f'\nTOOLS')
         log(f'\n  froster')
-        log(f'    version: v{pkg_resources.get_distribution("froster").version}')
+        log(f'    version: v{get_froster_version()}')
         log(f'    path: {os.path.join(froster_dir, "froster")}')
 
         log(f'\n  python')
@@ -6351,6 +7138,8 @@ class Commands:
                     log(f'\nError: The folder {folder} does not exist.\n')
                     return False
 
+            warn_atime_updates(self.args.folders)
+
             # Index the given folders
             return arch.index(self.args.folders)
 
@@ -6388,6 +7177,8 @@ class Commands:
             if not self.args.folders:
                 arch.archive_select_hotspots()
             else:
+                warn_atime_updates(self.args.folders)
+
                 # Archive the given folders
                 arch.archive(self.args.folders)
                 
@@ -6401,7 +7192,7 @@ class Commands:
             if not self.args.folders:
 
                 # Get the list of folders from the archive
-                files = arch.archive_json_get_csv(
+                files = arch.archive_json_get_rows(
                     ['local_folder', 's3_storage_class', 'profile', 'archive_mode'])
 
                 if not files:
@@ -6442,7 +7233,7 @@ class Commands:
             if not self.args.folders:
 
                 # Get the list of folders from the archive
-                files = arch.archive_json_get_csv(
+                files = arch.archive_json_get_rows(
                     ['local_folder', 's3_storage_class', 'profile'])
 
                 if not files:
@@ -6491,7 +7282,7 @@ class Commands:
 
             if not self.args.folders:
                 # Get the list of folders from the archive
-                files = arch.archive_json_get_csv(
+                files = arch.archive_json_get_rows(
                     ['local_folder', 's3_storage_class', 'profile', 'archive_mode'])
 
                 if not files:
@@ -6531,10 +7322,7 @@ class Commands:
 
             if not self.args.folders:
                 # No folders provided, manually select folder to unmount
-                files = "\n".join(mounts)
-                files = "Mountpoint\n" + files
-
-                app = TableArchive(files)
+                app = TableArchive([('Mountpoint',), *((m,) for m in mounts)])
                 retline = app.run()
 
                 self.args.folders = [retline[0]]
@@ -6606,7 +7394,7 @@ class Commands:
             print_error()
             return False
 
-    def subcmd_update(self, mute_no_update):
+    def subcmd_update(self, mute_no_update=False):
         '''Check if an update is available'''
         try:
 
@@ -6637,7 +7425,7 @@ class Commands:
                 return
 
             latest = releases[0]['tag_name'].replace('v', '')
-            current = pkg_resources.get_distribution("froster").version
+            current = get_froster_version()
 
             if compare_versions(latest, current) > 0:
                 log(f'\nA froster update is available!')
@@ -6656,12 +7444,16 @@ class Commands:
             print_error()
             return False
 
-    def parse_arguments(self):
-        '''Gather and parse command-line arguments'''
+    def parse_arguments(self, argv=None):
+        '''Gather and parse command-line arguments. Only the sub-command
+        found in argv (default: sys.argv[1:]) gets its arguments'''
 
-        parser = argparse.ArgumentParser(prog='froster ',
-                                         description='A (mostly) automated tool for archiving large scale data ' +
-                                         'after finding folders in the file system that are worth archiving.')
+        parser = FrosterArgumentParser(prog='froster ',
+                                       description='A (mostly) automated tool for archiving large scale data ' +
+                                       'after finding folders in the file system that are worth archiving.',
+                                       epilog='Arguments can also be read from a file, one per line, ' +
+                                       'e.g. "froster archive @folders.txt"',
+                                       fromfile_prefix_chars='@')
 
         # ***
 
@@ -6692,17 +7484,100 @@ class Commands:
         # ***
 
         parser_credentials = subparsers.add_parser('credentials', aliases=['crd'],
-                                                   help=textwrap.dedent(f'''
-                Check the current credentials for the selected provider are valid.
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+                                                   help=HELP_CREDENTIALS, formatter_class=HELP_FORMATTER)
 
         # ***
 
         parser_config = subparsers.add_parser('config', aliases=['cnf'],
-                                              help=textwrap.dedent(f'''
-                Bootstrap the configurtion, install dependencies and setup your environment.
-                You will need to answer a few questions about your cloud and hpc setup.
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+                                              help=HELP_CONFIG, formatter_class=HELP_FORMATTER)
+
+        # ***
+
+        parser_index = subparsers.add_parser('index', aliases=['idx'],
+                                             help=HELP_INDEX, formatter_class=HELP_FORMATTER)
+
+        # ***
+
+        parser_archive = subparsers.add_parser('archive', aliases=['arc'],
+                                               help=HELP_ARCHIVE, formatter_class=HELP_FORMATTER)
+
+        # ***
+
+        parser_delete = subparsers.add_parser('delete', aliases=['del'],
+                                              help=HELP_DELETE, formatter_class=HELP_FORMATTER)
+
+        # ***
+
+        parser_mount = subparsers.add_parser('mount', aliases=['umount'],
+                                             help=HELP_MOUNT, formatter_class=HELP_FORMATTER)
+
+        # ***
+
+        parser_restore = subparsers.add_parser('restore', aliases=['rst'],
+                                               help=HELP_RESTORE, formatter_class=HELP_FORMATTER)
+
+        # ***
+
+        # parser_ssh = subparsers.add_parser('ssh', aliases=['scp'],
+        #                                    help=textwrap.dedent(f'''
+        #         Login to an AWS EC2 instance to which data was restored with the --aws option
+        #     '''), formatter_class=argparse.RawTextHelpFormatter)
+
+        # parser_ssh.add_argument('--list', '-l', dest='list', action='store_true', default=False,
+        #                         help="List running Froster AWS EC2 instances")
+
+        # parser_ssh.add_argument('--terminate', '-t', dest='terminate', action='store', default='',
+        #                         metavar='<hostname>', help='Terminate AWS EC2 instance with this public IP Address.')
+
+        # parser_ssh.add_argument('sshargs', action='store', default=[], nargs='*',
+        #                         help='multiple arguments to ssh/scp such as hostname or user@hostname oder folder' +
+        #                         '')
+
+        # ***
+
+        parser_update = subparsers.add_parser('update', aliases=['upd'],
+                                              help=HELP_UPDATE, formatter_class=HELP_FORMATTER)
+
+        # Add the arguments of the selected sub-command only, the others
+        # are not needed to parse this command line
+        builders = {
+            parser_config: self._add_config_arguments,
+            parser_index: self._add_index_arguments,
+            parser_archive: self._add_archive_arguments,
+            parser_delete: self._add_delete_arguments,
+            parser_mount: self._add_mount_arguments,
+            parser_restore: self._add_restore_arguments,
+            parser_update: self._add_update_arguments,
+        }
+        subcmd = self._find_subcmd(argv, subparsers.choices)
+        if subcmd is None:
+            # The sub-command is not on the command line (e.g. it is in an
+            # arguments file), add them all and let argparse decide
+            for subparser, builder in builders.items():
+                builder(subparser)
+        elif subparsers.choices[subcmd] in builders:
+            builders[subparsers.choices[subcmd]](subparsers.choices[subcmd])
+
+        return parser
+
+    def _find_subcmd(self, argv, subcmds):
+        '''Get the first sub-command name of the command line. Option values
+        (e.g. '--co 8' or '-dc 8') are never sub-command names, so they are
+        skipped without knowing the option syntax. Returns None if there is
+        no sub-command or an arguments file comes first'''
+
+        if argv is None:
+            argv = sys.argv[1:]
+
+        for arg in argv:
+            if arg.startswith('@'):
+                return None
+            if arg in subcmds:
+                return arg
+        return None
+
+    def _add_config_arguments(self, parser_config):
+        '''Add the arguments of the config sub-command'''
 
         parser_config.add_argument('-p', '--print', dest='print', action='store_true',
                                    help="Print the current configuration")
@@ -6710,15 +7585,8 @@ class Commands:
         parser_config.add_argument('-r', '--reset', dest='reset', action='store_true',
                                    help="Delete the current configuration and start over")
 
-        # ***
-
-        parser_index = subparsers.add_parser('index', aliases=['idx'],
-                                             help=textwrap.dedent(f'''
-                Scan a file system folder tree using 'pwalk' and generate a hotspots CSV file
-                that lists the largest folders. As this process is compute intensive the
-                index job will be automatically submitted to Slurm if the Slurm tools are
-                found.
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+    def _add_index_arguments(self, parser_index):
+        '''Add the arguments of the index sub-command'''
 
         parser_index.add_argument('folders', action='store', default=[],  nargs='*',
                                   help='Folders you would like to index (separated by space), ' +
@@ -6730,15 +7598,8 @@ class Commands:
         parser_index.add_argument('-y', '--pwalk-copy', dest='pwalkcopy', action='store', default='',
                                   help='Directory where the pwalk CSV file should be copied to.')
 
-        # ***
-
-        parser_archive = subparsers.add_parser('archive', aliases=['arc'],
-                                               help=textwrap.dedent(f'''
-                Select from a list of large folders, that has been created by 'froster index', and
-                archive a folder to S3/Glacier. Once you select a folder the archive job will be
-                automatically submitted to Slurm. You can also automate this process
-
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+    def _add_archive_arguments(self, parser_archive):
+        '''Add the arguments of the archive sub-command'''
 
         parser_archive.add_argument('folders', action='store', default=[], nargs='*',
                                     help='folders you would like to archive (separated by space), ' +
@@ -6751,31 +7612,12 @@ class Commands:
                                     help="Print read and write permissions for the provided folder(s)")
 
         parser_archive.add_argument('-l', '--larger', dest='larger', type=int, action='store', default=0,
-                                    help=textwrap.dedent(f'''
-                Archive folders larger than <GiB>. This option
-                works in conjunction with --older <days>. If both
-                options are set froster will print a command that
-                allows you to archive all matching folders at once.
-            '''))
+                                    help=HELP_ARCHIVE_LARGER)
         parser_archive.add_argument('-o', '--older', dest='older', type=int, action='store', default=0,
-                                    help=textwrap.dedent(f'''
-                Archive folders that have not been accessed more than
-                <days>. (optionally set --mtime to select folders that
-                have not been modified more than <days>). This option
-                works in conjunction with --larger <GiB>. If both
-                options are set froster will print a command that
-                allows you to archive all matching folders at once.
-            '''))
+                                    help=HELP_ARCHIVE_OLDER)
 
         parser_archive.add_argument('--newer', '-w', dest='newer', type=int, action='store', default=0,
-                                    help=textwrap.dedent(f'''
-                Archive folders that have been accessed within the last 
-                <days>. (optionally set --mtime to select folders that
-                have not been modified more than <days>). This option
-                works in conjunction with --larger <GiB>. If both 
-                options are set froster will print a command that 
-                allows you to archive all matching folders at once.
-            '''))
+                                    help=HELP_ARCHIVE_NEWER)
 
         parser_archive.add_argument('-n', '--nih', dest='nih', action='store_true',
                                     help="Search and Link Metadata from NIH Reporter")
@@ -6790,11 +7632,7 @@ class Commands:
                                     help="Archive the current folder and all sub-folders")
 
         parser_archive.add_argument('-s', '--reset', dest='reset', action='store_true',
-                                    help=textwrap.dedent(f'''
-                                                        This will not download any data, but recusively reset a folder
-                                                        from previous (e.g. failed) archiving attempt.
-                                                        It will delete .froster.md5sum and extract Froster.smallfiles.tar
-                                                        '''))
+                                    help=HELP_ARCHIVE_RESET)
 
         parser_archive.add_argument('-t', '--no-tar', dest='notar', action='store_true',
                                     help="Do not move small files to tar file before archiving")
@@ -6802,13 +7640,8 @@ class Commands:
         parser_archive.add_argument('-d', '--dry-run', dest='dryrun', action='store_true',
                                     help="Execute a test archive without actually copying the data")
 
-        # ***
-
-        parser_delete = subparsers.add_parser('delete', aliases=['del'],
-                                              help=textwrap.dedent(f'''
-                Remove data from a local filesystem folder that has been confirmed to
-                be archived (through checksum verification). Use this instead of deleting manually
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+    def _add_delete_arguments(self, parser_delete):
+        '''Add the arguments of the delete sub-command'''
 
         parser_delete.add_argument('folders', action='store', default=[],  nargs='*',
                                    help='folders (separated by space) from which you would like to delete files, ' +
@@ -6820,13 +7653,9 @@ class Commands:
 
         parser_delete.add_argument('-r', '--recursive', dest='recursive', action='store_true',
                                    help="Delete the current archived folder and all archived sub-folders")
-        # ***
 
-        parser_mount = subparsers.add_parser('mount', aliases=['umount'],
-                                             help=textwrap.dedent(f'''
-                Mount or unmount the remote S3 or Glacier storage in your local file system
-                at the location of the original folder.
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+    def _add_mount_arguments(self, parser_mount):
+        '''Add the arguments of the mount sub-command'''
 
         parser_mount.add_argument('folders', action='store', default=[],  nargs='*',
                                   help='archived folders (separated by space) which you would like to mount.' +
@@ -6840,14 +7669,8 @@ class Commands:
         parser_mount.add_argument('-m', '--mount-point', dest='mountpoint', action='store', default='',
                                   help='pick a custom mount point, this only works if you select a single folder.')
 
-        # ***
-
-        parser_restore = subparsers.add_parser('restore', aliases=['rst'],
-                                               help=textwrap.dedent(f'''
-                Restore data from AWS Glacier to AWS S3 One Zone-IA. You do not need
-                to download all data to local storage after the restore is complete.
-                Just use the mount sub command.
-            '''), formatter_class=argparse.RawTextHelpFormatter)
+    def _add_restore_arguments(self, parser_restore):
+        '''Add the arguments of the restore sub-command'''
 
         parser_restore.add_argument('folders', action='store', default=[],  nargs='*',
                                     help='folders you would like to to restore (separated by space)')
@@ -6868,84 +7691,59 @@ class Commands:
                                     help="Monitor EC2 server for cost and idle time.")
 
         parser_restore.add_argument('-o', '--retrieve-opt', dest='retrieveopt', action='store', default='Bulk',
-                                    help=textwrap.dedent(f'''
-            More information at:
-                https://docs.aws.amazon.com/AmazonS3/latest/userguide/restoring-objects-retrieval-options.html
-                https://aws.amazon.com/es/s3/pricing/
-
-            S3 GLACIER DEEP ARCHIVE or S3 INTELLIGET-TIERING DEEP ARCHIVE ACCESS
-                Bulk:
-                    - Within 48 hours retrieval            <-- default
-                    - costs of $2.50 per TiB
-                Standard:
-                    - Within 12 hours retrieval
-                    - costs of $10 per TiB
-                Expedited:
-                    - 9-12 hours retrieval
-                    - costs of $30 per TiB
-                                                         
-            S3 GLACIER FLEXIBLE RETRIEVAL or S3 INTELLIGET-TIERING ARCHIVE ACCESS
-                Bulk:
-                    - 5-12 hours retrieval
-                    - costs of $2.50 per TiB
-                Standard:
-                    - 3-5 hours retrieval
-                    - costs of $10 per TiB
-                Expedited:
-                    - 1-5 minutes retrieval
-                    - costs of $30 per TiB
-
-                                                         
-                In addition to the retrieval cost, AWS will charge you about
-                $10/TiB/month for the duration you keep the data in S3.
-                (Costs in Summer 2023)
-                '''))
+                                    help=HELP_RESTORE_RETRIEVEOPT)
 
         parser_restore.add_argument('-r', '--recursive', dest='recursive', action='store_true',
                                     help="Restore the current archived folder and all archived sub-folders")
 
-        # ***
-
-        # parser_ssh = subparsers.add_parser('ssh', aliases=['scp'],
-        #                                    help=textwrap.dedent(f'''
-        #         Login to an AWS EC2 instance to which data was restored with the --aws option
-        #     '''), formatter_class=argparse.RawTextHelpFormatter)
-
-        # parser_ssh.add_argument('--list', '-l', dest='list', action='store_true', default=False,
-        #                         help="List running Froster AWS EC2 instances")
+    def _add_update_arguments(self, parser_update):
+        '''Add the arguments of the update sub-command'''
 
-        # parser_ssh.add_argument('--terminate', '-t', dest='terminate', action='store', default='',
-        #                         metavar='<hostname>', help='Terminate AWS EC2 instance with this public IP Address.')
+        parser_update.add_argument('--rclone', '-r', dest='rclone', action='store_true',
+                                   help="Update rclone to latests version")
 
-        # parser_ssh.add_argument('sshargs', action='store', default=[], nargs='*',
-        #                         help='multiple arguments to ssh/scp such as hostname or user@hostname oder folder' +
-        #                         '')
+def printdbg(*args, **kwargs):
+    if os.environ.get('DEBUG') != '1':
+        return
 
-        # ***
+    calling_function = sys._getframe(1).f_code.co_name
+    log(f' DBG {calling_function}():', args, kwargs)
 
-        parser_update = subparsers.add_parser('update', aliases=['upd'],
-                                              help=textwrap.dedent(f'''
-                Update froster to the latest version
-            '''), formatter_class=argparse.RawTextHelpFormatter)
 
-        parser_update.add_argument('--rclone', '-r', dest='rclone', action='store_true',
-                                   help="Update rclone to latests version")
+def printdbg_noop(*args, **kwargs):
+    '''Replaces printdbg once main() knows debug output is off'''
 
-        return parser
 
+@functools.lru_cache(maxsize=4096)
+def _resolve_path(path):
+    '''Resolve symlinks of an absolute path, cached as the same folders are
+    cleaned repeatedly during a run. Parents are resolved (and cached) first,
+    so each new component costs a single lstat unless it is a symlink'''
 
-def printdbg(*args, **kwargs):
-    if os.environ.get('DEBUG') == '1':
+    parent, name = os.path.split(path)
+    if not name or name in ('.', '..'):
+        return os.path.realpath(path)
 
-        current_frame = inspect.currentframe()
-        calling_function = current_frame.f_back.f_code.co_name
-        log(f' DBG {calling_function}():', args, kwargs)
+    resolved = os.path.join(_resolve_path(parent), name)
+    if os.path.islink(resolved):
+        return os.path.realpath(resolved)
+    return resolved
 
 
 def clean_path(path):
     try:
         if path:
-            return os.path.realpath(os.path.expanduser(path).rstrip(os.path.sep))
+            if path == '~' or path.startswith('~/'):
+                path = HOME_DIR + path[1:]
+            elif path.startswith('~'):
+                # Home folder of another user
+                path = os.path.expanduser(path)
+            path = path.rstrip(os.path.sep)
+            # Relative paths depend on the working directory, cache them
+            # by their absolute form
+            if not os.path.isabs(path):
+                path = os.path.join(os.getcwd(), path)
+            return _resolve_path(path)
         else:
             return path
 
@@ -6960,20 +7758,88 @@ def clean_path_list(paths):
     if not paths:
         return []
 
-    cleaned_paths = []
+    # Expand user and symlinks, and remove trailing slashes only if path is not empty
+    paths = [path for path in paths if path]
 
-    for path in paths:
-        try:
-            # Expand user and symlinks, and remove trailing slashes only if path is not empty
-            if path:
-                # Split the path into its components
-                cleaned_paths.append(clean_path(path))
+    if len(paths) < CLEAN_PATH_PARALLEL_MIN:
+        return [clean_path(path) for path in paths]
 
-        except Exception:
-            print_error()
-            sys.exit(1)
+    # Long folder lists wait on one lstat after the other, the syscalls
+    # release the GIL so threads can resolve them side by side
+    max_workers = min(16, (os.cpu_count() or 1) * 2)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(clean_path, paths))
+
+
+def get_mount_table():
+    '''Get a {mount_point: fs_type} dict of the current mounts.
+    The parsed table is cached for MOUNT_TABLE_TTL seconds'''
 
-    return cleaned_paths
+    global mount_table_cache
+
+    try:
+        mtime = os.stat(MOUNTINFO_FILE).st_mtime
+    except OSError:
+        mtime = None
+
+    cached_at, cached_mtime, table = mount_table_cache
+    if table is not None and cached_mtime == mtime and \
+            time.monotonic() - cached_at < MOUNT_TABLE_TTL:
+        return table
+
+    table = {}
+    with open(MOUNTINFO_FILE, 'r') as f:
+        for line in f:
+            # <id> <parent> <maj:min> <root> <mount point> <options> ... - <fs type> ...
+            fields = line.split()
+            separator = fields.index('-', 6)
+            # Spaces and other special characters are escaped as \ooo
+            mount_point = re.sub(r'\\([0-7]{3})',
+                                 lambda m: chr(int(m.group(1), 8)), fields[4])
+            table[mount_point] = fields[separator + 1]
+
+    mount_table_cache = (time.monotonic(), mtime, table)
+    return table
+
+
+def get_mount_options(path):
+    '''Get the mount options of the file system holding path'''
+
+    path = clean_path(path)
+    mount_point, options = '', []
+    with open(MOUNTINFO_FILE, 'r') as f:
+        for line in f:
+            # <id> <parent> <maj:min> <root> <mount point> <options> ...
+            fields = line.split()
+            mp = re.sub(r'\\([0-7]{3})',
+                        lambda m: chr(int(m.group(1), 8)), fields[4])
+            # The longest (and for equal ones the last) mount point wins
+            if (path == mp or path.startswith(mp.rstrip('/') + '/')) and \
+                    len(mp) >= len(mount_point):
+                mount_point, options = mp, fields[5].split(',')
+    return options
+
+
+def warn_atime_updates(folders):
+    '''Warn about folders on file systems mounted with strictatime, where
+    every file read while indexing or archiving also writes the access time'''
+
+    try:
+        for folder in folders:
+            options = get_mount_options(folder)
+            if options and 'noatime' not in options and 'relatime' not in options:
+                log(f'\nNote: {folder} is on a file system mounted with strictatime, '
+                    'every file read also writes its access time.')
+                log('      Consider mounting it with "relatime".\n')
+                return
+    except Exception:
+        printdbg(f'Could not read the mount options: {sys.exc_info()[1]}')
+
+
+def clear_mount_table_cache():
+    '''Forget the cached mount table after mounting or unmounting'''
+    global mount_table_cache
+    mount_table_cache = (0, None, None)
 
 
 def is_slurm_installed():
@@ -7008,8 +7874,8 @@ def get_caller_function():
     return caller_name
 
 
-def print_error(msg: str = None):
-    exc_type, exc_value, exc_tb = sys.exc_info()
+def print_error(msg: str = None, exc_info: tuple = None):
+    exc_type, exc_value, exc_tb = exc_info or sys.exc_info()
 
     if exc_tb is None:
         # Printing error message but no error raised from the code
@@ -7019,17 +7885,16 @@ def print_error(msg: str = None):
         error_code = 1
 
     else:
-        # Get the traceback details
-        traceback_details = traceback.extract_tb(exc_tb)
-
-        # Get the last call stack. The third element in the tuple is the function name
-        function_name = traceback_details[-1][2]
+        # Walk to the last call stack, where the exception was raised
+        tb = exc_tb
+        while tb.tb_next:
+            tb = tb.tb_next
+        code = tb.tb_frame.f_code
 
-        # Get the filename
-        file_name = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-
-        # Get the line number
-        line = exc_tb.tb_lineno
+        # Get the function name, filename and line number
+        function_name = code.co_name
+        file_name = os.path.basename(code.co_filename)
+        line = tb.tb_lineno
 
         # Get the error code
         if hasattr(exc_value, 'errno'):
@@ -7074,6 +7939,13 @@ def log(*args, **kwargs):
         return False
 
 
+def get_froster_version():
+    '''Get the installed froster version'''
+    # importlib.metadata reads only this distribution's metadata, unlike
+    # pkg_resources which scans every installed package on import
+    return importlib.metadata.version('froster')
+
+
 def print_log():
 
     global logger
@@ -7088,116 +7960,130 @@ def print_log():
             print("\nNo log file found\n")
 
 
+# Sub-commands and their aliases, the Commands method handling them, the
+# objects it takes (built on demand) and whether it needs valid credentials
+SUBCMDS = (
+    (('config', 'cnf'), 'subcmd_config', ('cfg', 'aws'), False),
+    (('index', 'idx'), 'subcmd_index', ('cfg', 'arch'), False),
+    (('umount',), 'subcmd_umount', ('arch',), False),
+    (('credentials', 'crd'), 'subcmd_credentials', ('cfg', 'aws'), False),
+    (('update', 'upd'), 'subcmd_update', (), False),
+    (('archive', 'arc'), 'subcmd_archive', ('arch', 'aws'), True),
+    (('restore', 'rst'), 'subcmd_restore', ('arch', 'aws'), True),
+    (('delete', 'del'), 'subcmd_delete', ('arch', 'aws'), True),
+    (('mount', 'mnt'), 'subcmd_mount', ('arch', 'aws'), True),
+)
+
+SUBCMD_DISPATCH = {name: handler[1:]
+                   for handler in SUBCMDS for name in handler[0]}
+
+
+def froster_excepthook(exc_type, exc_value, exc_tb):
+    '''Report the exceptions main() lets through and exit with an error'''
+
+    if issubclass(exc_type, KeyboardInterrupt):
+        print("\nOperation cancelled by user. Exiting...\n")
+    else:
+        print_error(exc_info=(exc_type, exc_value, exc_tb))
+    sys.exit(1)
+
+
 def main():
 
-    if not sys.platform.startswith('linux'):
+    global printdbg
+
+    # Errors are reported by the hook instead of a handler around main()
+    sys.excepthook = froster_excepthook
+
+    if not IS_LINUX:
         log('Froster currently only runs on Linux x64\n')
         sys.exit(1)
 
-    try:
-
-        # Declaring variables
-        TABLECSV = ''  # CSV string for DataTable
-        SELECTEDFILE = ''  # CSV filename to open in hotspots
-        MAXHOTSPOTS = 0
+    # Print the version without building the argument parser
+    if sys.argv[1:] in (['-v'], ['--version']):
+        log(f'froster v{get_froster_version()}')
+        sys.exit(0)
 
-        # Init Commands class
-        cmd = Commands()
+    # Declaring variables
+    TABLECSV = ''  # CSV string for DataTable
+    SELECTEDFILE = ''  # CSV filename to open in hotspots
+    MAXHOTSPOTS = 0
 
-        # Get the args
-        args = cmd.args
+    # Init Commands class
+    cmd = Commands()
 
-        # Init Config Manager class
-        cfg = ConfigManager()
+    # Get the args
+    args = cmd.args
 
-        # Init Archiver class
-        arch = Archiver(args, cfg)
+    # DEBUG is final once the arguments are parsed, skip the checks in printdbg
+    if os.environ.get('DEBUG') != '1':
+        printdbg = printdbg_noop
 
-        # Init AWS Boto class
-        aws = AWSBoto(args, cfg, arch)
+    # If no arguments, then print help
+    if len(sys.argv) == 1:
+        cmd.print_help()
+        sys.exit(1)
 
-        # If no arguments, then print help
-        if len(sys.argv) == 1:
-            cmd.print_help()
-            sys.exit(1)
+    # Print current version of froster
+    if args.version:
+        cmd.print_version()
+        sys.exit(0)
 
-        # Print current version of froster
-        if args.version:
-            cmd.print_version()
-            sys.exit(0)
-
-        # Print information regarding froster and tools used
-        if args.info:
-            cmd.print_info(cfg)
-            sys.exit(0)
-
-        # print the log
-        if args.log_print:
-            print_log()
-            sys.exit(0)
-
-        # Restore folder and files permissions
-        if cfg.is_shared and cfg.shared_dir:
-            cfg.assure_permissions_and_group(cfg.shared_dir)
-
-        # CLI commands that do NOT need credentials or configuration
-        if args.subcmd in ['config', 'cnf']:
-            res = cmd.subcmd_config(cfg, aws)
-        elif args.subcmd in ['index', 'ind']:
-            res = cmd.subcmd_index(cfg, arch)
-        elif args.subcmd in ['umount']:
-            res = cmd.subcmd_umount(arch, aws)
-        elif args.subcmd in ['credentials', 'crd']:
-            res = cmd.subcmd_credentials(cfg, aws)
-        elif args.subcmd in ['update', 'upd']:
-            # Calling check_update as we are checking for udpates (used to store the last timestamp check)
-            cfg.check_update()
-            res = cmd.subcmd_update(mute_no_update=False)
-        else:
+    # Init Config Manager class
+    cfg = ConfigManager()
 
-            # Check credentials
-            if not aws.check_credentials(prints=False):
-                log('Error: Invalid credentials.')
-                log(f'  Profile: {cfg.profile}')
-                log(f'  Provider: {cfg.provider}')
-                log(f'  Endpoint: {cfg.endpoint}\n')
-                sys.exit(1)
+    # Print information regarding froster and tools used
+    if args.info:
+        cmd.print_info(cfg)
+        sys.exit(0)
 
-            # CLI commands that need credentials and configuration.
-            if args.subcmd in ['archive', 'arc']:
-                res = cmd.subcmd_archive(arch, aws)
-            elif args.subcmd in ['restore', 'rst']:
-                res = cmd.subcmd_restore(arch, aws)
-            elif args.subcmd in ['delete', 'del']:
-                res = cmd.subcmd_delete(arch, aws)
-            elif args.subcmd in ['mount', 'mnt']:
-                res = cmd.subcmd_mount(arch, aws)
-            # elif args.subcmd in ['ssh', 'scp']:
-            #     res = cmd.subcmd_ssh(cfg, aws)
-            else:
-                cmd.print_help()
-                sys.exit(1)
+    # print the log
+    if args.log_print:
+        print_log()
+        sys.exit(0)
 
-   # Check if there are updates on froster every X days
-        if cfg.check_update():
-            cmd.subcmd_update(mute_no_update=True)
+    # Restore folder and files permissions
+    if cfg.is_shared and cfg.shared_dir:
+        cfg.assure_permissions_and_group(cfg.shared_dir)
 
-        if res:
-            sys.exit(0)
-        else:
-            sys.exit(1)
+    handler = SUBCMD_DISPATCH.get(args.subcmd)
+    if handler is None:
+        cmd.print_help()
+        sys.exit(1)
+    method, needs, needs_credentials = handler
 
-    except KeyboardInterrupt:
-        print("\nOperation cancelled by user. Exiting...\n")
+    # Archiver and AWSBoto are only built for the commands that use them
+    objects = {'cfg': cfg}
+    if 'arch' in needs or 'aws' in needs:
+        # Init Archiver class
+        objects['arch'] = Archiver(args, cfg)
+    if 'aws' in needs:
+        # Init AWS Boto class
+        objects['aws'] = AWSBoto(args, cfg, objects['arch'])
+
+    # Check credentials
+    if needs_credentials and not objects['aws'].check_credentials(prints=False):
+        log('Error: Invalid credentials.')
+        log(f'  Profile: {cfg.profile}')
+        log(f'  Provider: {cfg.provider}')
+        log(f'  Endpoint: {cfg.endpoint}\n')
         sys.exit(1)
 
-    except Exception:
-        print_error()
+    if method == 'subcmd_update':
+        # Calling check_update as we are checking for udpates (used to store the last timestamp check)
+        cfg.check_update()
+
+    res = getattr(cmd, method)(*(objects[name] for name in needs))
+
+    # Check if there are updates on froster every X days
+    if cfg.check_update():
+        cmd.subcmd_update(mute_no_update=True)
+
+    if res:
+        sys.exit(0)
+    else:
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except Exception:
-        sys.exit(1)
+    main()
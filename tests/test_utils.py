@@ -0,0 +1,116 @@
+from froster.froster import *
+import os
+import tempfile
+import unittest
+
+
+class TestEC2InstanceTypes(unittest.TestCase):
+    '''Test the EC2 instance types table used to size restore instances.'''
+
+    def test_sorted_by_disk_size(self):
+        '''_ec2_create_instance picks the first type that is large enough'''
+
+        sizes = [size for _, size in EC2_INSTANCE_TYPES]
+        self.assertEqual(sizes, sorted(sizes))
+
+
+class TestFindSubcmd(unittest.TestCase):
+    '''Test the sub-command lookup that decides which arguments to build.'''
+
+    def setUp(self):
+        self.cmd = Commands.__new__(Commands)
+        self.subcmds = {'archive': None, 'arc': None, 'index': None}
+
+    def test_subcmd_first(self):
+        self.assertEqual(self.cmd._find_subcmd(
+            ['archive', '/data'], self.subcmds), 'archive')
+
+    def test_subcmd_after_options(self):
+        for argv in (['-c', '8', 'arc', '/data'],
+                     ['--co', '8', 'archive', '/data'],
+                     ['-dc', '8', 'archive', '/data'],
+                     ['--mem=8', 'index', '/data']):
+            with self.subTest(argv=argv):
+                self.assertIn(self.cmd._find_subcmd(argv, self.subcmds),
+                              ('archive', 'arc', 'index'))
+
+    def test_subcmd_missing(self):
+        self.assertIsNone(self.cmd._find_subcmd(['-d'], self.subcmds))
+        self.assertIsNone(self.cmd._find_subcmd([], self.subcmds))
+
+    def test_arguments_file_first(self):
+        self.assertIsNone(self.cmd._find_subcmd(
+            ['@args.txt', 'archive'], self.subcmds))
+
+    def test_parse_abbreviated_options(self):
+        '''Abbreviated main options still get the sub-command arguments'''
+
+        argv = ['--co', '8', 'archive', '/data']
+        args = self.cmd.parse_arguments(argv).parse_args(argv)
+        self.assertEqual(args.cores, 8)
+        self.assertEqual(args.subcmd, 'archive')
+        self.assertEqual(args.folders, ['/data'])
+
+
+class TestParseSqueueOutput(unittest.TestCase):
+    '''Test the parsing of headerless squeue output.'''
+
+    def test_parse_jobs(self):
+        slurm = Slurm.__new__(Slurm)
+        output = '"123","froster:archive","R","1:00","9:00","1","4","64G","N/A","node1"\n' \
+            '\n' \
+            '"124","job, with comma","PD","0:00","10:00","1","2","8G","N/A","(Priority)"'
+        jobs = slurm._parse_squeue_output(output)
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(list(jobs[0]), list(Slurm.SQUEUE_HEADERS))
+        self.assertEqual(jobs[0]['JOBID'], '123')
+        self.assertEqual(jobs[0]['NODELIST(REASON)'], 'node1')
+        self.assertEqual(jobs[1]['NAME'], 'job, with comma')
+        self.assertEqual(jobs[1]['ST'], 'PD')
+
+    def test_parse_empty(self):
+        self.assertEqual(Slurm.__new__(Slurm)._parse_squeue_output(''), [])
+
+
+class TestCleanPath(unittest.TestCase):
+    '''Test path cleaning with symlinks and '..' components.'''
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.tmp.name)
+        os.makedirs(os.path.join(self.root, 'real', 'sub'))
+        os.symlink(os.path.join(self.root, 'real', 'sub'),
+                   os.path.join(self.root, 'link'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_symlink(self):
+        self.assertEqual(clean_path(os.path.join(self.root, 'link', 'x')),
+                         os.path.join(self.root, 'real', 'sub', 'x'))
+
+    def test_dotdot_after_symlink(self):
+        '''A '..' after a symlink goes up from the link target, as in realpath'''
+
+        path = os.path.join(self.root, 'link', '..', 'x')
+        self.assertEqual(clean_path(path), os.path.realpath(path))
+        self.assertEqual(clean_path(path),
+                         os.path.join(self.root, 'real', 'x'))
+
+    def test_trailing_slash_and_relative(self):
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.root)
+            self.assertEqual(clean_path('real/sub/'),
+                             os.path.join(self.root, 'real', 'sub'))
+        finally:
+            os.chdir(cwd)
+
+    def test_home(self):
+        self.assertEqual(clean_path('~/x'),
+                         os.path.realpath(os.path.expanduser('~/x')))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)